@@ -0,0 +1,380 @@
+"""Persistent file catalog (SQLite, WAL mode).
+
+Remembers what was found in previously scanned folders so later operations
+can skip expensive per-file work (EXIF parsing, hashing) for files whose
+size and mtime have not changed. The catalog is only a cache: losing or
+deleting the database never loses user data.
+
+Two tables:
+- `files`: path-keyed rows (dev/inode, size, mtime_ns, type class, EXIF date).
+- `hashes`: content hashes keyed by file identity (dev, inode, size,
+  mtime_ns), so they survive renames and moves. Shared by the cleaner and by
+  plugins through `Catalog.file_hash`.
+
+Together they form the size/hash index of reference libraries: imports are
+matched against `rows_by_size` + cached hashes without touching the library.
+"""
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from hashing import hash_file
+from scanner import FileEntry
+from utils import IMAGE_EXTS, VIDEO_EXTS
+
+CATALOG_FILENAME = "catalog.db"
+SCHEMA_VERSION = 4
+
+# Commit every N buffered writes so long runs don't hold one giant transaction.
+COMMIT_EVERY = 2000
+
+# Hash cache eviction: entries unused this long (or beyond this count) are dropped.
+HASH_MAX_AGE_DAYS = 180
+HASH_MAX_ENTRIES = 5_000_000
+
+
+def app_data_dir() -> Path:
+    """Per-user data directory (same org/app names as QSettings)."""
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or str(Path.home())
+    elif sys.platform == "darwin":
+        base = str(Path.home() / "Library" / "Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    return Path(base) / "MediaManager" / "Pro"
+
+
+def file_kind(ext: str) -> str:
+    """Type class used by the dashboard: 'image', 'video' or 'other'."""
+    if ext in IMAGE_EXTS:
+        return "image"
+    if ext in VIDEO_EXTS:
+        return "video"
+    return "other"
+
+
+def _prefix_bounds(root) -> tuple:
+    """Key range [lo, hi) covering every path strictly below `root`."""
+    prefix = os.path.join(os.fspath(root), "")
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _today() -> int:
+    return int(time.time() // 86400)
+
+
+def _identity(entry, algorithm: str) -> tuple:
+    # Without an inode number (scandir on Windows reports 0) fall back to the path.
+    path_key = "" if entry.ino else entry.path
+    return (entry.dev, entry.ino, path_key, entry.size, entry.mtime_ns, algorithm)
+
+
+class CatalogRow(NamedTuple):
+    path: str
+    dev: int
+    ino: int
+    size: int
+    mtime_ns: int
+    kind: str
+    exif_date: Optional[str]
+
+
+class Catalog:
+    """Path-keyed catalog of files, their stat identity and derived metadata.
+
+    Open it inside `QThread.run`, not in `__init__`. The instance may then be
+    shared with that worker's helper threads (e.g. the hashing pool).
+    """
+
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_dir = app_data_dir()
+            db_dir.mkdir(parents=True, exist_ok=True)
+            db_path = db_dir / CATALOG_FILENAME
+        self.db_path = Path(db_path)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    dev INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    exif_date TEXT
+                ) WITHOUT ROWID"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS hashes (
+                    dev INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    path_key TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (dev, ino, path_key, size, mtime_ns, algorithm)
+                ) WITHOUT ROWID"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS files_size ON files (size)")
+            if version < 4:
+                # Video dates used to be the file mtime; let them be re-read from the container.
+                self._conn.execute("UPDATE files SET exif_date = NULL WHERE kind = 'video'")
+            self._conn.execute("PRAGMA user_version = %d" % SCHEMA_VERSION)
+
+    # -- lifecycle -------------------------------------------------------
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        try:
+            self.commit()
+        finally:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _wrote(self, n: int = 1) -> None:
+        # Caller holds self._lock.
+        self._pending += n
+        if self._pending >= COMMIT_EVERY:
+            self._conn.commit()
+            self._pending = 0
+
+    # -- bulk sync -------------------------------------------------------
+
+    def sync(self, root, entries: Iterable) -> int:
+        """Reconcile the catalog with a fresh walk of `root`.
+
+        `entries` are `scanner.FileEntry` items for the whole tree. Rows whose
+        identity (dev/ino/size/mtime) changed lose their cached EXIF date; rows
+        for files that disappeared are deleted. Returns the number
+        of inserted/changed/deleted rows.
+        """
+        lo, hi = _prefix_bounds(root)
+        with self._lock:
+            known = {
+                row[0]: row[1:]
+                for row in self._conn.execute(
+                    "SELECT path, dev, ino, size, mtime_ns FROM files WHERE path >= ? AND path < ?", (lo, hi)
+                )
+            }
+            upserts = []
+            for e in entries:
+                old = known.pop(e.path, None)
+                if old is not None and old == (e.dev, e.ino, e.size, e.mtime_ns):
+                    continue
+                upserts.append((e.path, e.dev, e.ino, e.size, e.mtime_ns, file_kind(e.ext)))
+            with self._conn:
+                self._conn.executemany(
+                    """INSERT INTO files (path, dev, ino, size, mtime_ns, kind) VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(path) DO UPDATE SET
+                         dev=excluded.dev, ino=excluded.ino, size=excluded.size,
+                         mtime_ns=excluded.mtime_ns, kind=excluded.kind,
+                         exif_date=NULL""",
+                    upserts,
+                )
+                self._conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in known))
+            self._pending = 0
+        return len(upserts) + len(known)
+
+    # -- per-file access -------------------------------------------------
+
+    def lookup(self, entry) -> Optional[CatalogRow]:
+        """Cached row for `entry`, or None if unknown or stale (size/mtime changed)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, dev, ino, size, mtime_ns, kind, exif_date FROM files WHERE path = ?",
+                (entry.path,),
+            ).fetchone()
+        if row is None:
+            return None
+        row = CatalogRow(*row)
+        if row.size != entry.size or row.mtime_ns != entry.mtime_ns:
+            return None
+        return row
+
+    def upsert(self, entry, exif_date: Optional[str] = None) -> None:
+        """Record `entry`, keeping cached metadata if its identity is unchanged."""
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO files (path, dev, ino, size, mtime_ns, kind, exif_date)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(path) DO UPDATE SET
+                     exif_date=CASE WHEN files.size=excluded.size AND files.mtime_ns=excluded.mtime_ns
+                                    THEN COALESCE(excluded.exif_date, files.exif_date) ELSE excluded.exif_date END,
+                     dev=excluded.dev, ino=excluded.ino, size=excluded.size,
+                     mtime_ns=excluded.mtime_ns, kind=excluded.kind""",
+                (entry.path, entry.dev, entry.ino, entry.size, entry.mtime_ns, file_kind(entry.ext), exif_date),
+            )
+            self._wrote()
+
+    def set_exif_date(self, path, exif_date: Optional[str]) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE files SET exif_date = ? WHERE path = ?", (exif_date, os.fspath(path)))
+            self._wrote()
+
+    def move(self, old_path, new_path) -> None:
+        """Re-key a row after a rename/move. Size/mtime and metadata survive a move."""
+        old_path, new_path = os.fspath(old_path), os.fspath(new_path)
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (new_path,))
+            self._conn.execute("UPDATE files SET path = ? WHERE path = ?", (new_path, old_path))
+            self._wrote()
+
+    def remove(self, path) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (os.fspath(path),))
+            self._wrote()
+
+    # -- content hash cache ----------------------------------------------
+
+    def get_hash(self, entry, algorithm: str = "md5") -> Optional[str]:
+        """Cached digest for a file identity (`scanner.FileEntry`-like), or None."""
+        key = _identity(entry, algorithm)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, last_used FROM hashes WHERE dev = ? AND ino = ? AND path_key = ? "
+                "AND size = ? AND mtime_ns = ? AND algorithm = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            today = _today()
+            if row[1] < today:
+                # At most one bookkeeping write per entry per day.
+                self._conn.execute(
+                    "UPDATE hashes SET last_used = ? WHERE dev = ? AND ino = ? AND path_key = ? "
+                    "AND size = ? AND mtime_ns = ? AND algorithm = ?",
+                    (today,) + key,
+                )
+                self._wrote()
+        return row[0]
+
+    def put_hash(self, entry, digest: str, algorithm: str = "md5") -> None:
+        """Store a digest; older versions of the same file are evicted right away."""
+        key = _identity(entry, algorithm)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM hashes WHERE dev = ? AND ino = ? AND path_key = ? AND algorithm = ?",
+                (key[0], key[1], key[2], algorithm),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes (dev, ino, path_key, size, mtime_ns, algorithm, digest, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (digest, _today()),
+            )
+            self._wrote()
+
+    def file_hash(self, path, algorithm: str = "md5") -> Optional[str]:
+        """Content hash of `path`, from the cache when the file is unchanged.
+
+        Used for the source side of verified cross-device moves; plugins
+        can call it through `open_catalog()`.
+        """
+        path = os.fspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        entry = FileEntry(path, os.path.basename(path), os.path.splitext(path)[1].lower(),
+                          st.st_size, st.st_mtime_ns, st.st_dev, st.st_ino)
+        digest = self.get_hash(entry, algorithm)
+        if digest is None:
+            digest = hash_file(path, algorithm)
+            if digest is not None:
+                self.put_hash(entry, digest, algorithm)
+        return digest
+
+    def evict_hashes(self, max_age_days: int = HASH_MAX_AGE_DAYS, max_entries: int = HASH_MAX_ENTRIES) -> int:
+        """Drop hash entries unused for `max_age_days`, then the least recently used beyond `max_entries`."""
+        with self._lock, self._conn:
+            removed = self._conn.execute("DELETE FROM hashes WHERE last_used < ?", (_today() - max_age_days,)).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+            if count > max_entries:
+                removed += self._conn.execute(
+                    "DELETE FROM hashes WHERE (dev, ino, path_key, size, mtime_ns, algorithm) IN ("
+                    "SELECT dev, ino, path_key, size, mtime_ns, algorithm FROM hashes ORDER BY last_used LIMIT ?)",
+                    (count - max_entries,),
+                ).rowcount
+            self._pending = 0
+        return removed
+
+    # -- queries ---------------------------------------------------------
+
+    def rows_under(self, root) -> List[CatalogRow]:
+        lo, hi = _prefix_bounds(root)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, dev, ino, size, mtime_ns, kind, exif_date FROM files "
+                "WHERE path >= ? AND path < ? ORDER BY path",
+                (lo, hi),
+            ).fetchall()
+        return [CatalogRow(*r) for r in rows]
+
+    def rows_by_size(self, roots: Iterable, sizes: Iterable[int]) -> Dict[int, List[CatalogRow]]:
+        """Rows under any of `roots` whose size is one of `sizes`, grouped by size."""
+        sizes = sorted(set(sizes))
+        result: Dict[int, List[CatalogRow]] = {}
+        for root in roots:
+            lo, hi = _prefix_bounds(root)
+            for i in range(0, len(sizes), 500):
+                chunk = sizes[i:i + 500]
+                with self._lock:
+                    rows = self._conn.execute(
+                        "SELECT path, dev, ino, size, mtime_ns, kind, exif_date FROM files "
+                        "WHERE size IN (%s) AND path >= ? AND path < ?" % ",".join("?" * len(chunk)),
+                        chunk + [lo, hi],
+                    ).fetchall()
+                for r in rows:
+                    result.setdefault(r[3], []).append(CatalogRow(*r))
+        return result
+
+    def folder_stats(self, root) -> Optional[Dict]:
+        """Dashboard stats for `root` from the last sync, or None if never scanned."""
+        lo, hi = _prefix_bounds(root)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM files "
+                "WHERE path >= ? AND path < ? GROUP BY kind",
+                (lo, hi),
+            ).fetchall()
+        if not rows:
+            return None
+        stats = {"images": 0, "videos": 0, "others": 0, "size": 0}
+        key = {"image": "images", "video": "videos", "other": "others"}
+        for kind, count, size in rows:
+            stats[key.get(kind, "others")] += count
+            stats["size"] += size
+        stats["size_mb"] = round(stats["size"] / (1024 * 1024), 2)
+        return stats
+
+
+def open_catalog(db_path=None) -> Optional[Catalog]:
+    """Open the catalog, or return None if it can't be used (read-only disk, etc.)."""
+    try:
+        return Catalog(db_path)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,403 @@
+"""Parallel image conversion on a process pool.
+
+Decoding and encoding are CPU bound and hold the GIL inside Pillow for long
+stretches, so conversions run in worker processes. A memory budget limits
+how much decoded pixel data can be in flight at once: each task is charged
+its estimated decoded size (read from the image header), and new tasks wait
+until running ones release enough of the budget. A task bigger than the
+whole budget still runs, alone.
+
+`ConversionManifest` makes re-runs incremental: only new or changed sources
+(or ones converted with other settings) are converted again.
+
+Encoder settings come from named profiles (`PROFILES`); `benchmark_profiles`
+measures them on a sample of the user's own images.
+
+This module must stay importable without Qt: worker processes import it.
+"""
+import io
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from PIL import Image, UnidentifiedImageError
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+DEFAULT_CONVERT_WORKERS = os.cpu_count() or 1
+# Decoded pixels + the converted copy the encoder works on.
+MEMORY_OVERHEAD = 2
+# Used when the header can't be read: compressed images are rarely > 10x smaller.
+FALLBACK_EXPANSION = 10
+POLL_INTERVAL = 0.2
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 2
+
+# Encoder settings per profile and output format. 'fast' trades size for
+# encode speed, 'smallest' spends encode time (and some quality) on size.
+PROFILES = {
+    'fast': {
+        '.jpg': {'quality': 90},
+        '.png': {'compress_level': 1},
+        '.webp': {'quality': 85, 'method': 0},
+    },
+    'balanced': {
+        # The default: same quality as before profiles existed, only smarter encoding.
+        '.jpg': {'quality': 95, 'optimize': True},
+        '.png': {'compress_level': 6},
+        '.webp': {'quality': 95, 'method': 4},
+    },
+    'smallest': {
+        '.jpg': {'quality': 85, 'optimize': True, 'progressive': True},
+        '.png': {'compress_level': 9, 'optimize': True},
+        '.webp': {'quality': 80, 'method': 6},
+    },
+}
+DEFAULT_PROFILE = 'balanced'
+BENCHMARK_SAMPLE = 12
+
+
+def default_memory_budget() -> int:
+    """A quarter of physical memory (2 GB if that can't be determined)."""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 4
+    except (AttributeError, ValueError, OSError):
+        return 2 * 1024 ** 3
+
+
+class ConvertTask(NamedTuple):
+    src: str
+    dst: str
+    target_format: str  # extension with dot, e.g. '.webp'
+    max_size: int = 0  # longest side of the output in pixels (0: keep size)
+    profile: str = DEFAULT_PROFILE  # key of PROFILES
+
+    def settings(self) -> str:
+        """Everything besides the source that determines the output (manifest key)."""
+        return f"{self.target_format}|{self.max_size}|{self.profile}"
+
+
+class ConvertResult(NamedTuple):
+    task: ConvertTask
+    # 'ok', 'corrupt', 'denied', 'save_error' or 'error'
+    status: str
+    detail: str = ""
+
+
+def _fit(size, max_size: int):
+    """`size` scaled down so its longest side is `max_size` (None if it already fits)."""
+    w, h = size
+    if not max_size or max(w, h) <= max_size:
+        return None
+    ratio = max_size / max(w, h)
+    return max(1, round(w * ratio)), max(1, round(h * ratio))
+
+
+def _jpeg_scale(size, target) -> int:
+    """Largest DCT scale denominator (1, 2, 4, 8) `draft()` can use and still cover `target`."""
+    for scale in (8, 4, 2):
+        if size[0] // scale >= target[0] and size[1] // scale >= target[1]:
+            return scale
+    return 1
+
+
+def open_reduced(path, max_size: int = 0) -> Image.Image:
+    """Open and decode an image, already reduced to fit `max_size` (0: full size).
+
+    JPEGs are decoded at 1/2, 1/4 or 1/8 scale by the DCT itself (`draft()`);
+    other formats are shrunk by an integer factor with `reduce()` (a cheap
+    box filter) before the final Lanczos resize to the exact size.
+    """
+    img = Image.open(path)
+    target = _fit(img.size, max_size)
+    if target is None:
+        img.load()
+        return img
+    if img.format == 'JPEG':
+        img.draft(img.mode, target)
+    elif img.mode in ('1', 'P'):
+        # Palette images can only be scaled with nearest neighbour.
+        converted = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        img.close()
+        img = converted
+    factor = min(img.size[0] // target[0], img.size[1] // target[1])
+    if factor >= 2:
+        reduced = img.reduce(factor)
+        img.close()
+        img = reduced
+    if img.size != target:
+        img = img.resize(target, Image.Resampling.LANCZOS)
+    return img
+
+
+def estimate_memory(path, max_size: int = 0) -> int:
+    """Bytes needed to decode and re-encode the image at `path` (header read only)."""
+    try:
+        with Image.open(path) as img:
+            w, h = img.size
+            target = _fit(img.size, max_size)
+            if target is not None and img.format == 'JPEG':
+                scale = _jpeg_scale(img.size, target)
+                w, h = -(-w // scale), -(-h // scale)
+            return w * h * len(img.getbands()) * MEMORY_OVERHEAD
+    except Exception:
+        try:
+            return os.path.getsize(path) * FALLBACK_EXPANSION
+        except OSError:
+            return 0
+
+
+def save_options(target_format: str, profile: str = DEFAULT_PROFILE) -> Dict:
+    """Keyword arguments for `Image.save` for a format under an encoder profile."""
+    fmt = '.jpg' if target_format == '.jpeg' else target_format
+    return dict(PROFILES.get(profile, PROFILES[DEFAULT_PROFILE]).get(fmt, {}))
+
+
+def _prepare(img, target_format: str):
+    if target_format in ('.jpg', '.jpeg') and img.mode in ('RGBA', 'P'):
+        return img.convert('RGB')
+    return img
+
+
+def convert_image(task: ConvertTask) -> ConvertResult:
+    """Convert one image (runs in a worker process). Never raises."""
+    try:
+        with open_reduced(task.src, task.max_size) as img:
+            _prepare(img, task.target_format).save(task.dst, **save_options(task.target_format, task.profile))
+        return ConvertResult(task, 'ok')
+    except UnidentifiedImageError:
+        return ConvertResult(task, 'corrupt')
+    except PermissionError:
+        return ConvertResult(task, 'denied')
+    except OSError as e:
+        return ConvertResult(task, 'save_error', str(e))
+    except Exception as e:
+        return ConvertResult(task, 'error', str(e))
+
+
+class ConversionPool:
+    """Runs `convert_image` on worker processes within a memory budget."""
+
+    def __init__(self, workers: int = DEFAULT_CONVERT_WORKERS, memory_budget: Optional[int] = None):
+        self.workers = max(1, workers)
+        self.memory_budget = memory_budget or default_memory_budget()
+
+    def run(
+        self,
+        tasks: Iterable[ConvertTask],
+        should_stop: Optional[Callable[[], bool]] = None,
+        fn: Callable[[ConvertTask], ConvertResult] = convert_image,
+    ) -> Iterator[ConvertResult]:
+        """Yield a result per task as conversions finish (completion order).
+
+        When `should_stop` fires, tasks not started are dropped at once;
+        conversions already running are waited for and their results still
+        yielded, so the caller can record the outputs they wrote.
+        """
+        queue = list(tasks)
+        queue.reverse()  # pop() from the end keeps input order
+        running = {}
+        in_use = 0
+        next_cost = None
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            while queue or running:
+                if queue and should_stop is not None and should_stop():
+                    queue.clear()
+                    for fut in list(running):
+                        if fut.cancel():
+                            in_use -= running.pop(fut)[1]
+                    continue
+                while queue and len(running) < 2 * self.workers:
+                    if next_cost is None:
+                        next_cost = estimate_memory(queue[-1].src, queue[-1].max_size)
+                    if running and in_use + next_cost > self.memory_budget:
+                        break
+                    task = queue.pop()
+                    running[pool.submit(fn, task)] = (task, next_cost)
+                    in_use += next_cost
+                    next_cost = None
+                done, _ = wait(running, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    task, cost = running.pop(fut)
+                    in_use -= cost
+                    try:
+                        result = fut.result()
+                    except Exception as e:
+                        # The worker process died (e.g. killed for memory).
+                        result = ConvertResult(task, 'error', str(e))
+                    yield result
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ConversionManifest:
+    """What the converter produced last time, kept next to the outputs.
+
+    Maps each source (relative to the converted folder) and target format to
+    the source's size and mtime_ns, the conversion settings and the output
+    file, so a re-run only converts new or changed sources, outputs in other
+    formats are kept, and outputs of deleted sources can be dropped.
+    """
+
+    def __init__(self, root, output_dir, entries: Optional[Dict[str, Dict[str, Dict]]] = None):
+        self.root = os.fspath(root)
+        self.output_dir = os.fspath(output_dir)
+        self.entries = entries or {}
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.output_dir, MANIFEST_NAME)
+
+    @classmethod
+    def load(cls, root, output_dir) -> "ConversionManifest":
+        """Manifest in `output_dir` (empty if missing or unreadable)."""
+        manifest = cls(root, output_dir)
+        try:
+            with open(manifest.path, encoding="utf-8") as f:
+                data = json.load(f)
+            files = data.get("files")
+            if not isinstance(files, dict):
+                return manifest
+            if data.get("version") == MANIFEST_VERSION:
+                manifest.entries = files
+            elif data.get("version") == 1:
+                # Version 1 kept one record per source; its format leads the settings.
+                manifest.entries = {key: {rec["settings"].split("|", 1)[0]: rec} for key, rec in files.items()}
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+        return manifest
+
+    def save(self) -> None:
+        """Write atomically (temporary file + rename)."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def _key(self, src) -> str:
+        return os.path.relpath(os.fspath(src), self.root).replace(os.sep, "/")
+
+    def output_of(self, src, target_format: str) -> Optional[str]:
+        """Output path recorded for `src` in `target_format`, if it still exists."""
+        rec = self.entries.get(self._key(src), {}).get(target_format)
+        if rec is None:
+            return None
+        dst = os.path.join(self.output_dir, rec["dst"])
+        return dst if os.path.exists(dst) else None
+
+    def up_to_date(self, entry, task: ConvertTask) -> bool:
+        """True if the scanner `entry` was converted with `task`'s settings, unchanged since and its output is there."""
+        rec = self.entries.get(self._key(entry.path), {}).get(task.target_format)
+        return (
+            rec is not None
+            and rec["size"] == entry.size
+            and rec["mtime_ns"] == entry.mtime_ns
+            and rec["settings"] == task.settings()
+            and self.output_of(entry.path, task.target_format) is not None
+        )
+
+    def record(self, entry, task: ConvertTask) -> None:
+        self.entries.setdefault(self._key(entry.path), {})[task.target_format] = {
+            "size": entry.size,
+            "mtime_ns": entry.mtime_ns,
+            "settings": task.settings(),
+            "dst": os.path.relpath(task.dst, self.output_dir).replace(os.sep, "/"),
+        }
+
+    def forget(self, src, target_format: str) -> None:
+        formats = self.entries.get(self._key(src))
+        if formats is not None:
+            formats.pop(target_format, None)
+            if not formats:
+                del self.entries[self._key(src)]
+
+    def outputs(self) -> Dict[str, str]:
+        """normcase'd output path -> source key, for every recorded output."""
+        return {
+            os.path.normcase(os.path.join(self.output_dir, rec["dst"])): key
+            for key, formats in self.entries.items()
+            for rec in formats.values()
+        }
+
+    def remove_orphans(self) -> List[str]:
+        """Delete outputs whose source no longer exists; returns the deleted output paths.
+
+        An output that a remaining source also recorded (same name written
+        in overwrite mode) is kept.
+        """
+        orphans = {key: formats for key, formats in self.entries.items()
+                   if not os.path.exists(os.path.join(self.root, key))}
+        for key in orphans:
+            del self.entries[key]
+        in_use = self.outputs()
+        removed = []
+        for key, formats in orphans.items():
+            for fmt, rec in formats.items():
+                dst = os.path.join(self.output_dir, rec["dst"])
+                if os.path.normcase(dst) in in_use:
+                    continue
+                try:
+                    os.remove(dst)
+                    removed.append(dst)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    # Keep the record so a later run retries.
+                    self.entries.setdefault(key, {})[fmt] = rec
+        return removed
+
+
+class ProfileScore(NamedTuple):
+    images: int
+    seconds: float  # encode time only
+    bytes: int
+
+    @property
+    def images_per_second(self) -> float:
+        return self.images / self.seconds if self.seconds > 0 else 0.0
+
+
+def benchmark_profiles(
+    paths: Iterable,
+    target_format: str,
+    max_size: int = 0,
+    profiles: Iterable[str] = tuple(PROFILES),
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Dict[str, ProfileScore]:
+    """Encode each image with every profile (into memory) and total time and size per profile.
+
+    Images are decoded once and encoded by all profiles in turn, on one
+    thread, so the numbers compare encoders only. Unreadable files are skipped.
+    """
+    paths = list(paths)
+    profiles = list(profiles)
+    totals = {p: [0, 0.0, 0] for p in profiles}
+    fmt = Image.registered_extensions().get(target_format)
+    for n, path in enumerate(paths, 1):
+        if should_stop is not None and should_stop():
+            break
+        try:
+            with open_reduced(path, max_size) as img:
+                img = _prepare(img, target_format)
+                for profile in profiles:
+                    buf = io.BytesIO()
+                    start = time.perf_counter()
+                    img.save(buf, format=fmt, **save_options(target_format, profile))
+                    elapsed = time.perf_counter() - start
+                    t = totals[profile]
+                    t[0] += 1
+                    t[1] += elapsed
+                    t[2] += buf.tell()
+        except Exception:
+            pass
+        if on_progress is not None:
+            on_progress(n / len(paths))
+    return {p: ProfileScore(*t) for p, t in totals.items()}
@@ -0,0 +1,344 @@
+"""Duplicate detection pipeline.
+
+Candidates go through progressively more expensive stages and each stage only
+sees what the previous one could not rule out:
+
+1. size       - free, comes from the directory walk
+2. sample     - hash of the first/last 64 KB (`utils.get_sample_hash`)
+3. full check - only for files that still collide and are larger than the sample:
+                small groups are compared side by side (`compare_group`), which
+                stops at the first differing block; large groups are hashed
+
+Stages 2 and 3 run on a `hashing.HashEngine`, so reads overlap across files.
+Hardlinks (same dev/inode) are collapsed up front: they already share storage.
+
+`match_reference` checks incoming files against an already indexed reference
+library (catalog rows + cached hashes): only the incoming side is read.
+
+Confirmed duplicates can be resolved by replacing them with hardlinks or
+copy-on-write reflinks (FICLONE on btrfs/XFS) after a byte-for-byte check,
+which actually gives the space back instead of moving files around.
+"""
+import errno
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from hashing import READ_BUFFER_SIZE, HashEngine
+from utils import SAMPLE_SIZE, get_hash, get_sample_hash
+
+try:
+    import fcntl  # type: ignore
+except ImportError:  # Windows
+    fcntl = None
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+REFLINK_SUPPORTED = fcntl is not None and sys.platform.startswith("linux")
+
+# Groups up to this size are compared byte-by-byte instead of hashed (one open file each).
+LOCKSTEP_MAX_GROUP = 8
+COMPARE_BLOCK = 256 * 1024
+
+
+@dataclass
+class DedupReport:
+    """Per-stage counts, for the log."""
+
+    files: int = 0
+    # Extra names of already-hardlinked files (skipped, they share storage).
+    hardlinks: int = 0
+    size_candidates: int = 0
+    sample_candidates: int = 0
+    full_candidates: int = 0
+    # Files settled by side-by-side comparison instead of full hashing.
+    compared_candidates: int = 0
+    duplicates: int = 0
+    sample_bytes: int = 0
+    full_bytes: int = 0
+    compared_bytes: int = 0
+    # Bytes of same-size candidates that never had to be read in full.
+    skipped_bytes: int = 0
+
+
+def _split(entries: List, key: Callable) -> List[List]:
+    buckets: Dict = {}
+    for e in entries:
+        k = key(e)
+        if k:
+            buckets.setdefault(k, []).append(e)
+    return [grp for grp in buckets.values() if len(grp) > 1]
+
+
+def _compute(engine: HashEngine, groups: List[List], fn: Callable, should_stop, on_item) -> Dict[int, object]:
+    """Run `fn` over every member of `groups` on the engine; returns {id(entry): result}."""
+    results: Dict[int, object] = {}
+    for entry, value in engine.map((e for g in groups for e in g), fn, should_stop=should_stop):
+        results[id(entry)] = value
+        on_item()
+    return results
+
+
+def compare_group(paths: List, block: int = COMPARE_BLOCK) -> Tuple[List[List[int]], int]:
+    """Split same-size files into classes of identical content by reading them in lockstep.
+
+    Every round reads the next block of each still-matching file and
+    partitions the class by block content; a file whose block matches no
+    other is dropped (and no longer read). Returns (classes of indices into
+    `paths` with at least two members, bytes read). Unreadable files are left out.
+    """
+    files: Dict[int, object] = {}
+    bytes_read = 0
+    try:
+        for i, p in enumerate(paths):
+            try:
+                files[i] = open(p, "rb", buffering=0)
+            except OSError:
+                pass
+        classes = [list(files)] if len(files) > 1 else []
+        done: List[List[int]] = []
+        while classes:
+            nxt = []
+            for cls in classes:
+                blocks: Dict[bytes, List[int]] = {}
+                for i in cls:
+                    try:
+                        chunk = files[i].read(block)
+                    except OSError:
+                        continue
+                    bytes_read += len(chunk)
+                    blocks.setdefault(chunk, []).append(i)
+                for chunk, members in blocks.items():
+                    if len(members) < 2:
+                        for i in members:
+                            files.pop(i).close()
+                    elif not chunk:
+                        done.append(members)
+                    else:
+                        nxt.append(members)
+            classes = nxt
+        return done, bytes_read
+    finally:
+        for f in files.values():
+            f.close()
+
+
+def find_duplicate_groups(
+    entries: Iterable,
+    full_hash: Callable = lambda e: get_hash(e.path),
+    sample_hash: Callable = lambda e: get_sample_hash(e.path, e.size),
+    cached_hash: Optional[Callable] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+    engine: Optional[HashEngine] = None,
+    lockstep_max: int = LOCKSTEP_MAX_GROUP,
+) -> Tuple[List[List], DedupReport]:
+    """Group `scanner.FileEntry` items with identical content.
+
+    Each returned group is sorted by path; the first member is the one to keep.
+    `cached_hash(entry)` may return a previously stored full hash: size groups
+    where every member has one are grouped directly without reading anything.
+    Sample and full hashes are computed concurrently on `engine` (a
+    single-threaded one if omitted). Groups of at most `lockstep_max` files
+    are compared byte-by-byte instead of hashed (0 hashes everything). If
+    `should_stop` fires, the groups confirmed so far are returned.
+    """
+    entries = list(entries)
+    engine = engine or HashEngine(workers=1)
+    report = DedupReport(files=len(entries))
+    result: List[List] = []
+
+    # One representative per inode; entries with ino 0 (unknown) are kept as-is.
+    seen_inodes = set()
+    unique = []
+    for e in sorted(entries, key=lambda e: e.path):
+        if e.ino:
+            if (e.dev, e.ino) in seen_inodes:
+                report.hardlinks += 1
+                continue
+            seen_inodes.add((e.dev, e.ino))
+        unique.append(e)
+    entries = unique
+
+    size_groups = _split(entries, lambda e: e.size + 1)  # +1: keep empty files
+    report.size_candidates = sum(len(g) for g in size_groups)
+
+    to_sample: List[List] = []
+    for grp in size_groups:
+        if cached_hash is not None:
+            known = [cached_hash(e) for e in grp]
+            if all(known):
+                by_hash = dict(zip((id(e) for e in grp), known))
+                result.extend(_split(grp, lambda e: by_hash[id(e)]))
+                continue
+        to_sample.append(grp)
+
+    progress = {"done": 0, "total": sum(len(g) for g in to_sample) or 1, "base": 0.0}
+
+    def tick():
+        progress["done"] += 1
+        if on_progress is not None and progress["done"] % 16 == 0:
+            on_progress(progress["base"] + 0.5 * progress["done"] / progress["total"])
+
+    samples = _compute(engine, to_sample, sample_hash, should_stop, tick)
+    if should_stop is not None and should_stop():
+        return result, report
+
+    full_groups: List[List] = []
+    for grp in to_sample:
+        size = grp[0].size
+        sampled = _split(grp, lambda e: samples.get(id(e)))
+        report.sample_bytes += len(grp) * min(size, 2 * SAMPLE_SIZE)
+        for sub in sampled:
+            report.sample_candidates += len(sub)
+            if size <= 2 * SAMPLE_SIZE:
+                # The samples covered the whole file: already a byte-level match.
+                result.append(sub)
+            else:
+                full_groups.append(sub)
+        if size > 2 * SAMPLE_SIZE:
+            report.skipped_bytes += (len(grp) - sum(len(s) for s in sampled)) * size
+
+    lockstep = [g for g in full_groups if len(g) <= lockstep_max]
+    full_groups = [g for g in full_groups if len(g) > lockstep_max]
+    report.compared_candidates = sum(len(g) for g in lockstep)
+    report.full_candidates = sum(len(g) for g in full_groups)
+    progress.update(done=0, total=(report.compared_candidates + report.full_candidates) or 1, base=0.5)
+
+    def compare(grp):
+        return compare_group([e.path for e in grp])
+
+    for grp, (classes, nbytes) in engine.map(lockstep, compare, should_stop=should_stop):
+        result.extend([grp[i] for i in cls] for cls in classes)
+        report.compared_bytes += nbytes
+        report.skipped_bytes += len(grp) * grp[0].size - nbytes
+        for _ in grp:
+            tick()
+    if should_stop is not None and should_stop():
+        return result, report
+
+    full = _compute(engine, full_groups, full_hash, should_stop, tick)
+    for grp in full_groups:
+        if all(id(e) in full for e in grp):
+            result.extend(_split(grp, lambda e: full[id(e)]))
+            report.full_bytes += len(grp) * grp[0].size
+
+    for grp in result:
+        grp.sort(key=lambda e: e.path)
+    result.sort(key=lambda g: g[0].path)
+    report.duplicates = sum(len(g) - 1 for g in result)
+    if on_progress is not None:
+        on_progress(1.0)
+    return result, report
+
+
+def match_reference(
+    entries: Iterable,
+    by_size: Dict[int, List],
+    full_hash: Callable,
+    reference_hash: Callable,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+    engine: Optional[HashEngine] = None,
+) -> Tuple[List[Tuple[object, object]], DedupReport]:
+    """Find incoming entries whose content already exists in a reference library.
+
+    `by_size` maps size -> library rows (`Catalog.rows_by_size`);
+    `reference_hash(row)` returns the library file's indexed digest (or None
+    if it can't be trusted). Only incoming files whose size occurs in the
+    library are hashed. Returns ([(library_row, entry)], report), sorted by
+    the entry's path.
+    """
+    entries = list(entries)
+    engine = engine or HashEngine(workers=1)
+    report = DedupReport(files=len(entries))
+    candidates = []
+    for e in entries:
+        rows = [r for r in by_size.get(e.size, ()) if r.path != e.path and not (e.ino and (r.dev, r.ino) == (e.dev, e.ino))]
+        if rows:
+            candidates.append((e, rows))
+    report.size_candidates = report.full_candidates = len(candidates)
+
+    matches: List[Tuple[object, object]] = []
+    ref_digests: Dict[str, Optional[str]] = {}
+    total = len(candidates) or 1
+    digests = engine.map((e for e, _ in candidates), full_hash, should_stop=should_stop)
+    for n, ((e, rows), (_, digest)) in enumerate(zip(candidates, digests), 1):
+        report.full_bytes += e.size
+        if digest:
+            for row in rows:
+                if row.path not in ref_digests:
+                    ref_digests[row.path] = reference_hash(row)
+                if ref_digests[row.path] == digest:
+                    matches.append((row, e))
+                    break
+        if on_progress is not None and n % 16 == 0:
+            on_progress(n / total)
+    matches.sort(key=lambda m: m[1].path)
+    report.duplicates = len(matches)
+    if on_progress is not None:
+        on_progress(1.0)
+    return matches, report
+
+
+# -- resolution -------------------------------------------------------------
+
+def same_content(path_a, path_b, buffer_size: int = READ_BUFFER_SIZE) -> bool:
+    """Byte-for-byte comparison, stopping at the first differing block."""
+    try:
+        with open(path_a, "rb", buffering=0) as fa, open(path_b, "rb", buffering=0) as fb:
+            if os.fstat(fa.fileno()).st_size != os.fstat(fb.fileno()).st_size:
+                return False
+            while True:
+                a = fa.read(buffer_size)
+                b = fb.read(buffer_size)
+                if a != b:
+                    return False
+                if not a:
+                    return True
+    except OSError:
+        return False
+
+
+def _replace_atomically(dup: str, make_temp: Callable[[str], None]) -> None:
+    """Build the replacement next to `dup` under a temporary name, then swap it in."""
+    directory = os.path.dirname(dup)
+    fd, tmp = tempfile.mkstemp(prefix=".mmp-", dir=directory)
+    os.close(fd)
+    os.unlink(tmp)
+    try:
+        make_temp(tmp)
+        os.replace(tmp, dup)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def replace_with_hardlink(keep: str, dup: str) -> None:
+    """Make `dup` another name of `keep`. Both must be on the same filesystem."""
+    if os.stat(keep).st_dev != os.stat(os.path.dirname(dup) or ".").st_dev:
+        raise OSError(errno.EXDEV, "Hardlinks can't cross filesystems", dup)
+    _replace_atomically(dup, lambda tmp: os.link(keep, tmp))
+
+
+def replace_with_reflink(keep: str, dup: str) -> None:
+    """Make `dup` a copy-on-write clone of `keep` (btrfs, XFS, ...).
+
+    Keeps `dup`'s own timestamps and permissions; raises OSError where the
+    filesystem can't clone (EOPNOTSUPP/EXDEV/EINVAL).
+    """
+    if not REFLINK_SUPPORTED:
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform", dup)
+
+    def clone(tmp):
+        with open(keep, "rb") as src, open(tmp, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(dup, tmp)
+
+    _replace_atomically(dup, clone)
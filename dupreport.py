@@ -0,0 +1,127 @@
+"""Dry-run duplicate reports.
+
+The cleaner can write what it found to a JSON or CSV file instead of touching
+anything, so a cleanup can be reviewed (or edited) first and applied later
+without rescanning or rehashing. Each group lists the file to keep first;
+`wasted_bytes` is what resolving the group would free.
+
+Apply re-checks only the files a report names: recorded size/mtime must
+still match and, for exact duplicates, the bytes are compared again.
+"""
+import csv
+import datetime
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+REPORT_VERSION = 1
+CSV_FIELDS = ["group", "kind", "role", "path", "size", "mtime_ns", "wasted_bytes"]
+
+
+def _file(entry) -> Dict:
+    return {"path": entry.path, "size": entry.size, "mtime_ns": entry.mtime_ns}
+
+
+def _wasted(kind: str, files: Sequence[Dict]) -> int:
+    if kind == "exact":
+        return files[0]["size"] * (len(files) - 1)
+    # Near-duplicates: moving them away frees their own sizes.
+    return sum(f["size"] for f in files[1:])
+
+
+def _totals(groups: List[Dict]) -> Dict:
+    return {
+        "groups": len(groups),
+        "duplicates": sum(len(g["files"]) - 1 for g in groups),
+        "wasted_bytes": sum(g["wasted_bytes"] for g in groups),
+    }
+
+
+def build_report(root, exact_groups: Iterable[Sequence], similar_groups: Iterable[Sequence] = ()) -> Dict:
+    """Report dict from groups of `scanner.FileEntry` (first member is kept)."""
+    groups = []
+    for kind, source in (("exact", exact_groups), ("similar", similar_groups)):
+        for grp in source:
+            files = [_file(e) for e in grp]
+            groups.append({"id": len(groups) + 1, "kind": kind, "wasted_bytes": _wasted(kind, files), "files": files})
+    return {
+        "version": REPORT_VERSION,
+        "root": os.fspath(root),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "totals": _totals(groups),
+        "groups": groups,
+    }
+
+
+def save_report(report: Dict, path) -> None:
+    """Write as CSV if `path` ends in .csv, JSON otherwise."""
+    path = os.fspath(path)
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for g in report["groups"]:
+                for i, fi in enumerate(g["files"]):
+                    writer.writerow({
+                        "group": g["id"],
+                        "kind": g["kind"],
+                        "role": "keep" if i == 0 else "duplicate",
+                        "path": fi["path"],
+                        "size": fi["size"],
+                        "mtime_ns": fi["mtime_ns"],
+                        "wasted_bytes": g["wasted_bytes"] if i == 0 else "",
+                    })
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+
+
+def load_report(path) -> Dict:
+    """Read a report written by `save_report`; raises ValueError if it isn't one."""
+    path = os.fspath(path)
+    try:
+        if path.lower().endswith(".csv"):
+            return _load_csv(path)
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        if report.get("version") != REPORT_VERSION or not isinstance(report.get("groups"), list):
+            raise ValueError(f"Unsupported report: {path}")
+        return report
+    except (KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid report: {path} ({e})") from None
+
+
+def _load_csv(path: str) -> Dict:
+    by_id: Dict[str, Dict] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            g = by_id.setdefault(row["group"], {"kind": row["kind"], "keep": None, "dups": []})
+            fi = {"path": row["path"], "size": int(row["size"]), "mtime_ns": int(row["mtime_ns"])}
+            if row["role"] == "keep":
+                g["keep"] = fi
+            else:
+                g["dups"].append(fi)
+    groups = []
+    for g in by_id.values():
+        if g["keep"] is None or not g["dups"]:
+            continue
+        files = [g["keep"]] + g["dups"]
+        groups.append({"id": len(groups) + 1, "kind": g["kind"], "wasted_bytes": _wasted(g["kind"], files), "files": files})
+    return {"version": REPORT_VERSION, "root": "", "created": "", "totals": _totals(groups), "groups": groups}
+
+
+def report_pairs(report: Dict) -> Iterator[Tuple[str, Dict, Dict]]:
+    """(kind, keep, duplicate) for every duplicate listed in the report."""
+    for g in report["groups"]:
+        keep = g["files"][0]
+        for dup in g["files"][1:]:
+            yield g["kind"], keep, dup
+
+
+def unchanged(file: Dict) -> bool:
+    """True if the file still exists with the recorded size and mtime."""
+    try:
+        st = os.stat(file["path"])
+    except OSError:
+        return False
+    return st.st_size == file["size"] and st.st_mtime_ns == file["mtime_ns"]
@@ -0,0 +1,157 @@
+"""Folder exclusion rules applied while walking.
+
+Keeps the workers out of their own output and out of whatever the user
+lists in a `.mediamanagerignore` file at the top of the folder:
+
+- Built-in output folders (duplicates folder in every UI language,
+  converter and privacy output) are pruned wherever they appear.
+- The organizer also prunes top-level date folders of the current mode.
+- `.mediamanagerignore` uses gitignore syntax: `#` comments, `!` negation,
+  trailing `/` for directories only, a `/` inside the pattern anchors it to
+  the top folder, `*`, `?`, `[...]` and `**`. Nested ignore files are not read.
+
+Rules compile to regular expressions once; a matching directory is never
+listed, so whole subtrees are skipped.
+"""
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from languages import LANGUAGES
+
+IGNORE_FILE = ".mediamanagerignore"
+CONVERT_FOLDER = "Donusturulenler"
+PRIVACY_FOLDER = "Guvenli_Fotograflar"
+
+
+def output_folders() -> List[str]:
+    """Names of the folders the app writes its output to."""
+    names = {CONVERT_FOLDER, PRIVACY_FOLDER}
+    names.update(lang['duplicate_folder'] for lang in LANGUAGES.values() if 'duplicate_folder' in lang)
+    return sorted(names)
+
+
+def _glob_to_regex(glob: str) -> str:
+    out = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("/**", i) and i + 3 == n:
+            out.append("(?:/.*)?")
+            i += 3
+            continue
+        if glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = glob.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def compile_pattern(line: str) -> Optional[Tuple[re.Pattern, bool, bool]]:
+    """(regex over root-relative '/' paths, negated, directories only), or None for blanks/comments."""
+    line = line.rstrip("\n\r")
+    if not line.strip() or line.startswith("#"):
+        return None
+    line = line.rstrip(" ")
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\"):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    # Only a leading or middle slash anchors; the trailing one just means "directory".
+    anchored = "/" in line
+    line = line.lstrip("/")
+    if not line:
+        return None
+    prefix = "" if anchored else "(?:.*/)?"
+    return re.compile(prefix + _glob_to_regex(line) + r"\Z"), negate, dir_only
+
+
+class IgnoreRules:
+    """Callable `(path, is_dir) -> bool` telling the walker what to skip under `root`."""
+
+    def __init__(self, root, patterns: Iterable[str] = (), prune_names: Iterable[str] = (), top_level: Optional[str] = None):
+        self.root = os.path.join(os.fspath(root), "")
+        self.prune_names = frozenset(prune_names)
+        self.top_level = re.compile(top_level + r"\Z") if top_level else None
+        self.rules = [r for r in (compile_pattern(p) for p in patterns) if r is not None]
+        if not any(negate for _, negate, _ in self.rules):
+            # No negations: one combined regex per kind decides in a single pass.
+            files = [rx.pattern for rx, _, dir_only in self.rules if not dir_only]
+            dirs = [rx.pattern for rx, _, _ in self.rules]
+            self._files = re.compile("|".join(files)) if files else None
+            self._dirs = re.compile("|".join(dirs)) if dirs else None
+            self.rules = None
+
+    def __call__(self, path: str, is_dir: bool) -> bool:
+        if not path.startswith(self.root):
+            return False
+        rel = path[len(self.root):].replace(os.sep, "/")
+        name = rel.rsplit("/", 1)[-1]
+        if is_dir:
+            if name in self.prune_names:
+                return True
+            if self.top_level is not None and "/" not in rel and self.top_level.match(rel):
+                return True
+        elif rel == IGNORE_FILE:
+            return True
+        if self.rules is None:
+            rx = self._dirs if is_dir else self._files
+            return rx is not None and rx.match(rel) is not None
+        ignored = False
+        for rx, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if rx.match(rel):
+                ignored = not negate
+        return ignored
+
+
+def date_folder_regex(sample: str) -> str:
+    """Regex for folder names shaped like `sample` ('2000', '2000-01' or '2000-01-01')."""
+    return re.sub(r"\d", r"\\d", re.escape(sample))
+
+
+def load_rules(root, outputs: bool = True, date_folder: Optional[str] = None) -> IgnoreRules:
+    """Rules for walking `root`: built-in outputs, `.mediamanagerignore`, optional date folders.
+
+    `date_folder` is a sample folder name (e.g. '2000-01') whose shape is
+    pruned at the top level.
+    """
+    try:
+        with open(os.path.join(os.fspath(root), IGNORE_FILE), encoding="utf-8") as f:
+            patterns = f.readlines()
+    except (OSError, UnicodeDecodeError):
+        patterns = []
+    return IgnoreRules(
+        root,
+        patterns,
+        prune_names=output_folders() if outputs else (),
+        top_level=date_folder_regex(date_folder) if date_folder else None,
+    )
@@ -0,0 +1,181 @@
+"""Append-only journal for organizer runs.
+
+The whole move plan is written (and fsync'ed) before the first move; after
+that, one small record per completed move is appended and fsync'ed in
+batches. After a crash or a stop the journal says exactly which moves
+happened, so a run can be resumed or undone without rescanning the tree.
+
+Moves done after the last fsync are not lost either: a planned move whose
+source is gone and whose destination exists is treated as done.
+
+One journal per organized root, stored with the catalog (never inside the
+organized tree).
+
+A finished run ends with a 'complete' record, a finished undo with
+'undo_complete'. Steps that replaced an existing file ('overwrite') can be
+moved back, but the file they replaced is gone: undo reports them.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from catalog import app_data_dir
+from organizer import PlannedMove
+
+FSYNC_EVERY = 512
+FSYNC_INTERVAL = 1.0
+
+
+def journal_path(root) -> str:
+    key = hashlib.sha1(os.path.abspath(os.fspath(root)).encode("utf-8", "surrogatepass")).hexdigest()[:16]
+    return str(app_data_dir() / "journals" / f"organize-{key}.jsonl")
+
+
+class JournalState(NamedTuple):
+    root: str
+    plan: List[PlannedMove]
+    done: Set[int]
+    undone: Set[int]
+    complete: bool
+
+    def pending(self) -> List[int]:
+        """Indices of moves not done yet, or undone since (for resume), in plan order."""
+        moved = self.done - self.undone
+        return [i for i, m in enumerate(self.plan) if m.action != 'skip' and i not in moved]
+
+    def to_undo(self) -> List[int]:
+        """Indices of done moves not undone yet, newest first."""
+        return sorted(self.done - self.undone, reverse=True)
+
+    def irreversible(self, index: int) -> bool:
+        """True if plan entry `index` replaced a file that undo can't bring back."""
+        return self.plan[index].action == 'overwrite'
+
+
+def _moved(move: PlannedMove) -> bool:
+    return not os.path.lexists(move.src) and os.path.lexists(move.dst)
+
+
+def interrupted_run(root) -> Optional[str]:
+    """'organize' or 'undo' if the last run of that kind on `root` stopped before finishing, else None.
+
+    Cheap: reads the tail of the journal only.
+    """
+    try:
+        with open(journal_path(root), "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for line in reversed(lines):
+        try:
+            op = json.loads(line).get("op")
+        except ValueError:
+            continue
+        if op in ("complete", "undo_complete"):
+            return None
+        return 'undo' if op == "undone" else 'organize'
+    return None
+
+
+def load_journal(root) -> Optional[JournalState]:
+    """State of the last organizer run on `root`, or None if there is no journal."""
+    path = journal_path(root)
+    plan: List[PlannedMove] = []
+    done: Set[int] = set()
+    undone: Set[int] = set()
+    complete = False
+    journal_root = os.fspath(root)
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break  # torn last line after a crash
+                op = rec.get("op")
+                if op == "begin":
+                    journal_root = rec["root"]
+                elif op == "plan":
+                    plan.append(PlannedMove(rec["src"], rec["dst"], rec["action"]))
+                elif op == "done":
+                    done.add(rec["i"])
+                    undone.discard(rec["i"])
+                elif op == "undone":
+                    undone.add(rec["i"])
+                    complete = False
+                elif op == "complete":
+                    complete = True
+                elif op == "undo_complete":
+                    complete = False
+    except OSError:
+        return None
+    if not plan:
+        return None
+    # Reconcile moves that happened after the last fsync.
+    for i, move in enumerate(plan):
+        if move.action == 'skip' or i in done:
+            continue
+        if _moved(move):
+            done.add(i)
+    for i in done - undone:
+        move = plan[i]
+        if os.path.lexists(move.src) and not os.path.lexists(move.dst):
+            undone.add(i)
+    return JournalState(journal_root, plan, done, undone, complete)
+
+
+class JournalWriter:
+    """Appends records to a journal file, fsync'ing every FSYNC_EVERY records or FSYNC_INTERVAL seconds."""
+
+    def __init__(self, path: str, truncate: bool = False):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._f = open(path, "w" if truncate else "a", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @classmethod
+    def start(cls, root, plan: List[PlannedMove]) -> "JournalWriter":
+        """Begin a new journal for `root` holding the full plan (replaces any older one)."""
+        writer = cls(journal_path(root), truncate=True)
+        writer._write({"op": "begin", "root": os.fspath(root), "time": time.time(), "count": len(plan)})
+        for move in plan:
+            writer._write({"op": "plan", "src": move.src, "dst": move.dst, "action": move.action})
+        writer.sync()
+        return writer
+
+    @classmethod
+    def reopen(cls, root) -> "JournalWriter":
+        return cls(journal_path(root))
+
+    def _write(self, rec: Dict) -> None:
+        # Default ASCII escaping keeps undecodable (surrogate) file names intact.
+        self._f.write(json.dumps(rec) + "\n")
+        self._unsynced += 1
+
+    def record(self, op: str, index: int) -> None:
+        """Append a 'done'/'undone' record for plan entry `index`."""
+        self._write({"op": op, "i": index})
+        if self._unsynced >= FSYNC_EVERY or time.monotonic() - self._last_sync >= FSYNC_INTERVAL:
+            self.sync()
+
+    def complete(self, undo: bool = False) -> None:
+        """Mark the run (or, with `undo`, its undo) as finished."""
+        self._write({"op": "undo_complete" if undo else "complete"})
+        self.sync()
+
+    def sync(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        try:
+            self.sync()
+        finally:
+            self._f.close()
@@ -50,11 +50,43 @@ LANGUAGES = {
         'overwrite': 'Üstüne Yaz',
         'skip': 'Atla',
         'start_organize': '🚀 Düzenlemeyi Başlat',
+        'preview_organize': '📝 Önizle (deneme)',
+        'undo_organize': '↩️ Son Düzenlemeyi Geri Al',
+        'verify_moves': 'Başka diske kopyalanan dosyaları silmeden önce doğrula (sağlama toplamı)',
+        'resume_title': 'Yarım Kalan İşlem',
+        'resume_question': 'Bu klasördeki son düzenleme yarıda kaldı. Kaldığı yerden devam edilsin mi?\n(Hayır: yeni bir düzenleme başlatır)',
+        'resume_undo_question': 'Bu klasördeki son geri alma yarıda kaldı. Geri almaya devam edilsin mi?\n(Hayır: yeni bir düzenleme başlatır)',
         'clean': 'TEMİZLE',
         'clean_desc': 'Birebir aynı dosyaları bulur ve ayırır.',
         'clean_duplicates': '🧹 Kopyaları Temizle',
+        'hash_workers': 'Paralel okuma:',
+        'dedup_action': 'İşlem:',
+        'dedup_move': 'Kopyalar klasörüne taşı',
+        'dedup_hardlink': 'Sabit bağlantıyla değiştir (hardlink)',
+        'dedup_reflink': 'Reflink ile değiştir (btrfs/XFS)',
+        'hash_algorithm': 'Hash algoritması:',
+        'similar_images': 'Benzer görsel ve videoları da bul (yeniden kaydedilmiş/kodlanmış)',
+        'similar_threshold': 'Benzerlik eşiği (bit):',
+        'dup_report_btn': '📋 Yalnızca Rapor (deneme)',
+        'apply_report_btn': '📂 Kayıtlı Raporu Uygula...',
+        'reference_mode': 'Yalnızca referans arşivle karşılaştır:',
+        'reference_none': 'Referans arşiv yok',
+        'reference_add': 'Arşiv Ekle...',
+        'reference_clear': 'Temizle',
+        'reference_index': '📚 Arşivi İndeksle',
         'convert': 'DÖNÜŞTÜR',
         'convert_desc': 'Resim formatlarını değiştir.',
+        'max_size': 'Maks. boyut (uzun kenar):',
+        'original_size': 'Orijinal boyut',
+        'convert_incremental': '♻️ {} güncel, {} dönüştürülecek, {} eski çıktı silindi',
+        'convert_collision': '⚠️ {} atlandı: {} aynı çıktı adını kullanıyor',
+        'encoder_profile': 'Kodlayıcı profili:',
+        'profile_fast': 'Hızlı (düşük kalite)',
+        'profile_balanced': 'Dengeli',
+        'profile_smallest': 'En küçük (düşük kalite)',
+        'benchmark_btn': '📊 Profilleri Ölç',
+        'benchmark_start': '📊 Kodlayıcı profilleri {} örnek resimde ölçülüyor -> {}',
+        'benchmark_result': '📊 {}: {} resim/sn, toplam {} MB, resim başına {} KB',
         'target': 'Hedef:',
         'convert_btn': '🔄 Dönüştür',
         'privacy': 'GİZLİLİK',
@@ -95,6 +127,8 @@ LANGUAGES = {
         'folder_loaded': 'Klasör yüklendi: {}',
         'selected': '📂 Seçili: {}',
         'analysis_updated': '📊 Analiz güncellendi.',
+        'scan_progress': '📊 Taranıyor... {} dosya',
+        'scan_progress_eta': '📊 Taranıyor... {} dosya, ~{} kaldı',
         'unexpected_error': 'Beklenmedik Hata Oluştu',
         'error_occurred': 'Uygulama çalışırken beklenmedik bir hata meydana geldi.',
         'report_error': 'Lütfen bu hatayı geliştiriciye bildirin.',
@@ -122,16 +156,41 @@ LANGUAGES = {
         'start_organizing': '🚀 Düzenleme Başladı...',
         'process_stopped': '🛑 İşlem kullanıcı tarafından durduruldu.',
         'moved': '✅ Taşındı: {}',
+        'organize_plan': '📝 Plan: {} dosya, {} taşınacak, {} atlanacak',
+        'plan_move': '📝 {} → {}',
+        'resuming': '⏯️ Devam ediliyor: {} dosya zaten taşınmış, {} kaldı',
+        'nothing_to_resume': 'ℹ️ Devam edilecek yarım işlem yok.',
+        'undoing': '↩️ {} taşıma geri alınıyor...',
+        'nothing_to_undo': 'ℹ️ Geri alınacak işlem yok.',
+        'undo_overwritten': '⚠️ {}: üzerine yazılan dosya geri getirilemez',
         'skipped': '⏩ Atlandı: {}',
         'access_denied': '❌ Erişim Reddedildi: {}',
         'disk_error': '❌ Disk/Dosya Hatası: {} ({})',
         'unexpected_error_file': '❌ Beklenmedik Hata: {} ({})',
         'scan_start': '🔍 Kopya taraması başladı...',
         'duplicate_found': '⚠️ Kopya Bulundu: {}',
+        'dedup_stages': '📊 {} dosya → {} aynı boyut → {} aynı baş/son → {} yan yana karşılaştırma + {} tam hash → {} kopya',
+        'dedup_bytes': '📊 Okunan: {} MB örnek + {} MB karşılaştırma + {} MB tam hash, atlanan: {} MB',
         'read_error': '❌ Okuma İzni Yok: {}',
         'duplicate_folder': 'Mükerrer_Dosyalar',
         'moved_to_duplicates': '🗑️ Taşındı: {}',
         'move_error': '❌ Taşıma Hatası: {} ({})',
+        'hardlinks_skipped': '🔗 Zaten bağlantılı {} dosya atlandı',
+        'verify_failed': '⚠️ İçerik farklı, dokunulmadı: {}',
+        'linked': '🔗 Bağlandı: {} → {}',
+        'link_error': '❌ Bağlantı Hatası: {} ({})',
+        'space_reclaimed': '💾 Kazanılan alan: {} MB',
+        'similar_found': '🖼️ Benzer Görsel: {} ≈ {}',
+        'similar_video_found': '🎞️ Benzer Video: {} ≈ {}',
+        'report_saved': '📋 Rapor kaydedildi: {} grup, {} kopya, {} MB kazanılabilir → {}',
+        'report_loaded': '📂 Rapor yüklendi: {} grup, {} kopya, {} MB',
+        'report_changed': '⚠️ Rapordan sonra değişmiş, dokunulmadı: {}',
+        'dup_report_read_error': '❌ Rapor okunamadı: {}',
+        'in_library': '📚 Arşivde zaten var: {} = {}',
+        'reference_summary': '📚 {} dosya → {} dosya arşivle aynı boyutta → {} dosya arşivde zaten var',
+        'reference_indexing': '📚 İndeksleniyor {}: {} dosya, {} dosya hashlenecek',
+        'reference_indexed': '✅ Referans arşiv indeksi güncel',
+        'catalog_unavailable': '❌ Dosya kataloğu kullanılamıyor',
         'error_file': '❌ Hata: {} ({})',
         'converting': '🔄 Dönüştürülüyor -> {}',
         'converted': '✅ Çevrildi: {}',
@@ -192,11 +251,43 @@ LANGUAGES = {
         'overwrite': 'Overwrite',
         'skip': 'Skip',
         'start_organize': '🚀 Start Organizing',
+        'preview_organize': '📝 Preview (dry run)',
+        'undo_organize': '↩️ Undo Last Organize',
+        'verify_moves': 'Verify files copied to another drive before deleting them (checksum)',
+        'resume_title': 'Interrupted Run',
+        'resume_question': 'The last organize run on this folder was interrupted. Resume where it stopped?\n(No: start a new run)',
+        'resume_undo_question': 'The last undo on this folder was interrupted. Finish undoing it?\n(No: start a new run)',
         'clean': 'CLEAN',
         'clean_desc': 'Find and separate identical files.',
         'clean_duplicates': '🧹 Clean Duplicates',
+        'hash_workers': 'Parallel reads:',
+        'dedup_action': 'Action:',
+        'dedup_move': 'Move to duplicates folder',
+        'dedup_hardlink': 'Replace with hardlink',
+        'dedup_reflink': 'Replace with reflink (btrfs/XFS)',
+        'hash_algorithm': 'Hash algorithm:',
+        'similar_images': 'Also find similar images and videos (re-saved/re-encoded)',
+        'similar_threshold': 'Similarity threshold (bits):',
+        'dup_report_btn': '📋 Report Only (dry run)',
+        'apply_report_btn': '📂 Apply Saved Report...',
+        'reference_mode': 'Only match against reference libraries:',
+        'reference_none': 'No reference library',
+        'reference_add': 'Add Library...',
+        'reference_clear': 'Clear',
+        'reference_index': '📚 Index Libraries',
         'convert': 'CONVERT',
         'convert_desc': 'Convert image formats.',
+        'max_size': 'Max size (longest side):',
+        'original_size': 'Original size',
+        'convert_incremental': '♻️ {} up to date, {} to convert, {} stale outputs removed',
+        'convert_collision': '⚠️ Skipped {}: {} has the same output name',
+        'encoder_profile': 'Encoder profile:',
+        'profile_fast': 'Fast (lower quality)',
+        'profile_balanced': 'Balanced',
+        'profile_smallest': 'Smallest (lower quality)',
+        'benchmark_btn': '📊 Benchmark Profiles',
+        'benchmark_start': '📊 Benchmarking encoder profiles on {} sample images -> {}',
+        'benchmark_result': '📊 {}: {} img/s, {} MB total, {} KB/image',
         'target': 'Target:',
         'convert_btn': '🔄 Convert',
         'privacy': 'PRIVACY',
@@ -237,6 +328,8 @@ LANGUAGES = {
         'folder_loaded': 'Folder loaded: {}',
         'selected': '📂 Selected: {}',
         'analysis_updated': '📊 Analysis updated.',
+        'scan_progress': '📊 Scanning... {} files',
+        'scan_progress_eta': '📊 Scanning... {} files, ~{} left',
         'unexpected_error': 'Unexpected Error Occurred',
         'error_occurred': 'An unexpected error occurred while running the application.',
         'report_error': 'Please report this error to the developer.',
@@ -264,16 +357,41 @@ LANGUAGES = {
         'start_organizing': '🚀 Organizing Started...',
         'process_stopped': '🛑 Process stopped by user.',
         'moved': '✅ Moved: {}',
+        'organize_plan': '📝 Plan: {} files, {} to move, {} skipped',
+        'plan_move': '📝 {} → {}',
+        'resuming': '⏯️ Resuming: {} already moved, {} left',
+        'nothing_to_resume': 'ℹ️ No interrupted run to resume.',
+        'undoing': '↩️ Undoing {} moves...',
+        'nothing_to_undo': 'ℹ️ Nothing to undo.',
+        'undo_overwritten': '⚠️ {}: the file it replaced can\'t be restored',
         'skipped': '⏩ Skipped: {}',
         'access_denied': '❌ Access Denied: {}',
         'disk_error': '❌ Disk/File Error: {} ({})',
         'unexpected_error_file': '❌ Unexpected Error: {} ({})',
         'scan_start': '🔍 Duplicate scan started...',
         'duplicate_found': '⚠️ Duplicate Found: {}',
+        'dedup_stages': '📊 {} files → {} same size → {} same head/tail → {} compared side by side + {} full hashed → {} duplicates',
+        'dedup_bytes': '📊 Read {} MB of samples + {} MB compared + {} MB full hashes, skipped {} MB',
         'read_error': '❌ Read Permission Denied: {}',
         'duplicate_folder': 'Duplicate_Files',
         'moved_to_duplicates': '🗑️ Moved: {}',
         'move_error': '❌ Move Error: {} ({})',
+        'hardlinks_skipped': '🔗 {} already hardlinked files skipped',
+        'verify_failed': '⚠️ Content differs, left alone: {}',
+        'linked': '🔗 Linked: {} → {}',
+        'link_error': '❌ Link Error: {} ({})',
+        'space_reclaimed': '💾 Reclaimed {} MB',
+        'similar_found': '🖼️ Similar Image: {} ≈ {}',
+        'similar_video_found': '🎞️ Similar Video: {} ≈ {}',
+        'report_saved': '📋 Report saved: {} groups, {} duplicates, {} MB reclaimable → {}',
+        'report_loaded': '📂 Report loaded: {} groups, {} duplicates, {} MB',
+        'report_changed': '⚠️ Changed since the report, left alone: {}',
+        'dup_report_read_error': '❌ Report could not be read: {}',
+        'in_library': '📚 Already in library: {} = {}',
+        'reference_summary': '📚 {} files → {} same size as library files → {} already in library',
+        'reference_indexing': '📚 Indexing {}: {} files, {} to hash',
+        'reference_indexed': '✅ Reference library index is up to date',
+        'catalog_unavailable': '❌ File catalog is not available',
         'error_file': '❌ Error: {} ({})',
         'converting': '🔄 Converting -> {}',
         'converted': '✅ Converted: {}',
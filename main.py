@@ -2,17 +2,19 @@ import sys
 import os
 import glob
 import datetime
+import multiprocessing
 from pathlib import Path
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QFileDialog, QTextEdit, 
-    QComboBox, QTabWidget, QMessageBox, QSplitter, QStatusBar
+    QComboBox, QTabWidget, QMessageBox, QSplitter, QStatusBar, QSpinBox, QCheckBox
 )
 from PySide6.QtCore import Qt, QSettings 
 from PySide6.QtGui import QAction, QShortcut, QDragEnterEvent, QDropEvent, QKeySequence,QIcon
 
-from workers import AnalyzerWorker, OrganizerWorker, CleanerWorker, ConverterWorker, PrivacyWorker, InpaintWorker
+from workers import AnalyzerWorker, OrganizerWorker, CleanerWorker, ConverterWorker, EncoderBenchmarkWorker, PrivacyWorker, InpaintWorker, ReferenceIndexWorker
+from converter import DEFAULT_PROFILE, PROFILES
 from components import (
     StatCard, SmartProgressBar, EnhancedDropArea, QuickFilterBar, 
     FileTreeView, BatchRenameDialog, RecentFoldersMenu, PluginManagerDialog
@@ -21,6 +23,11 @@ from components import PreviewWidget
 from theme import ThemeManager
 from plugin_host import PluginHost
 from utils import BatchRenamer
+from catalog import open_catalog
+from watcher import LiveFolderWatcher
+from journal import interrupted_run
+from hashing import DEFAULT_HASH_WORKERS, available_backends, fastest_backend
+from perceptual import DEFAULT_THRESHOLD
 from languages import LANGUAGES, language_signal
 import traceback 
 
@@ -80,6 +87,8 @@ class MainWindow(QMainWindow):
         self.current_folder = None
         self.worker = None
         self.analyzer = None
+        self.live_watcher = LiveFolderWatcher(self)
+        self.live_watcher.stats_changed.connect(self.show_stats)
         
         self.setup_ui()
         self.setup_menu_bar()
@@ -177,9 +186,19 @@ class MainWindow(QMainWindow):
         self.combo_conf_org = create_conflict_combo()
         h_conflict.addWidget(self.combo_conf_org)
         l_org.addLayout(h_conflict)
+        self.chk_verify_moves = QCheckBox(self.lang_manager.get('verify_moves'))
+        self.chk_verify_moves.setChecked(str(self.settings.load_setting('verify_moves', False)).lower() == 'true')
+        self.chk_verify_moves.toggled.connect(lambda v: self.settings.save_setting('verify_moves', v))
+        l_org.addWidget(self.chk_verify_moves)
         self.btn_run_org = QPushButton(self.lang_manager.get('start_organize'))
-        self.btn_run_org.clicked.connect(self.run_organizer)
+        self.btn_run_org.clicked.connect(lambda: self.run_organizer())
         l_org.addWidget(self.btn_run_org)
+        self.btn_preview_org = QPushButton(self.lang_manager.get('preview_organize'))
+        self.btn_preview_org.clicked.connect(self.run_organizer_preview)
+        l_org.addWidget(self.btn_preview_org)
+        self.btn_undo_org = QPushButton(self.lang_manager.get('undo_organize'))
+        self.btn_undo_org.clicked.connect(self.run_organizer_undo)
+        l_org.addWidget(self.btn_undo_org)
         self.tabs.addTab(tab_org, self.lang_manager.get('organize'))
         
         tab_clean = QWidget()
@@ -193,10 +212,79 @@ class MainWindow(QMainWindow):
         self.combo_conf_clean = create_conflict_combo()
         h_conf_clean.addWidget(self.combo_conf_clean)
         l_clean.addLayout(h_conf_clean)
+        h_dedup_action = QHBoxLayout()
+        self.lbl_dedup_action = QLabel(self.lang_manager.get('dedup_action'))
+        h_dedup_action.addWidget(self.lbl_dedup_action)
+        self.combo_dedup_action = QComboBox()
+        self.combo_dedup_action.addItem(self.lang_manager.get('dedup_move'), 'move')
+        self.combo_dedup_action.addItem(self.lang_manager.get('dedup_hardlink'), 'hardlink')
+        self.combo_dedup_action.addItem(self.lang_manager.get('dedup_reflink'), 'reflink')
+        h_dedup_action.addWidget(self.combo_dedup_action)
+        l_clean.addLayout(h_dedup_action)
+        h_hash_workers = QHBoxLayout()
+        self.lbl_hash_workers = QLabel(self.lang_manager.get('hash_workers'))
+        h_hash_workers.addWidget(self.lbl_hash_workers)
+        self.spin_hash_workers = QSpinBox()
+        self.spin_hash_workers.setRange(1, 64)
+        self.spin_hash_workers.setValue(int(self.settings.load_setting('hash_workers', DEFAULT_HASH_WORKERS)))
+        self.spin_hash_workers.valueChanged.connect(lambda v: self.settings.save_setting('hash_workers', v))
+        h_hash_workers.addWidget(self.spin_hash_workers)
+        l_clean.addLayout(h_hash_workers)
+        h_hash_algo = QHBoxLayout()
+        self.lbl_hash_algo = QLabel(self.lang_manager.get('hash_algorithm'))
+        h_hash_algo.addWidget(self.lbl_hash_algo)
+        self.combo_hash_algo = QComboBox()
+        self.combo_hash_algo.addItems(available_backends())
+        saved_algo = self.settings.load_setting('hash_algorithm', '')
+        if saved_algo not in available_backends():
+            # First run: pick whatever hashes fastest on this machine, once.
+            saved_algo = fastest_backend()
+            self.settings.save_setting('hash_algorithm', saved_algo)
+        self.combo_hash_algo.setCurrentText(saved_algo)
+        self.combo_hash_algo.currentTextChanged.connect(lambda v: self.settings.save_setting('hash_algorithm', v))
+        h_hash_algo.addWidget(self.combo_hash_algo)
+        l_clean.addLayout(h_hash_algo)
+        h_similar = QHBoxLayout()
+        self.chk_similar = QCheckBox(self.lang_manager.get('similar_images'))
+        self.chk_similar.setChecked(str(self.settings.load_setting('similar_images', False)).lower() == 'true')
+        self.chk_similar.toggled.connect(lambda v: self.settings.save_setting('similar_images', v))
+        h_similar.addWidget(self.chk_similar)
+        self.lbl_similar_threshold = QLabel(self.lang_manager.get('similar_threshold'))
+        h_similar.addWidget(self.lbl_similar_threshold)
+        self.spin_similar_threshold = QSpinBox()
+        self.spin_similar_threshold.setRange(0, 16)
+        self.spin_similar_threshold.setValue(int(self.settings.load_setting('similar_threshold', DEFAULT_THRESHOLD)))
+        self.spin_similar_threshold.valueChanged.connect(lambda v: self.settings.save_setting('similar_threshold', v))
+        h_similar.addWidget(self.spin_similar_threshold)
+        l_clean.addLayout(h_similar)
+        h_reference = QHBoxLayout()
+        self.chk_reference = QCheckBox(self.lang_manager.get('reference_mode'))
+        h_reference.addWidget(self.chk_reference)
+        self.lbl_reference_paths = QLabel()
+        h_reference.addWidget(self.lbl_reference_paths, 1)
+        self.btn_ref_add = QPushButton(self.lang_manager.get('reference_add'))
+        self.btn_ref_add.clicked.connect(self.add_reference_library)
+        h_reference.addWidget(self.btn_ref_add)
+        self.btn_ref_clear = QPushButton(self.lang_manager.get('reference_clear'))
+        self.btn_ref_clear.clicked.connect(lambda: self.set_reference_libraries([]))
+        h_reference.addWidget(self.btn_ref_clear)
+        self.btn_ref_index = QPushButton(self.lang_manager.get('reference_index'))
+        self.btn_ref_index.clicked.connect(self.run_reference_index)
+        h_reference.addWidget(self.btn_ref_index)
+        l_clean.addLayout(h_reference)
+        self.set_reference_libraries(self.reference_libraries())
         self.btn_clean = QPushButton(self.lang_manager.get('clean_duplicates'))
         self.btn_clean.setStyleSheet("background-color: #D32F2F;")
         self.btn_clean.clicked.connect(self.run_cleaner)
         l_clean.addWidget(self.btn_clean)
+        h_report = QHBoxLayout()
+        self.btn_dup_report = QPushButton(self.lang_manager.get('dup_report_btn'))
+        self.btn_dup_report.clicked.connect(self.run_dup_report)
+        h_report.addWidget(self.btn_dup_report)
+        self.btn_apply_report = QPushButton(self.lang_manager.get('apply_report_btn'))
+        self.btn_apply_report.clicked.connect(self.run_apply_report)
+        h_report.addWidget(self.btn_apply_report)
+        l_clean.addLayout(h_report)
         self.tabs.addTab(tab_clean, self.lang_manager.get('clean'))
         
         tab_conv = QWidget()
@@ -211,6 +299,32 @@ class MainWindow(QMainWindow):
         self.combo_fmt.addItems([".jpg", ".png", ".webp", ".bmp"])
         h_conv.addWidget(self.combo_fmt)
         l_conv.addLayout(h_conv)
+        h_max_size = QHBoxLayout()
+        self.lbl_max_size = QLabel(self.lang_manager.get('max_size'))
+        h_max_size.addWidget(self.lbl_max_size)
+        self.spin_max_size = QSpinBox()
+        self.spin_max_size.setRange(0, 20000)
+        self.spin_max_size.setSingleStep(256)
+        self.spin_max_size.setSuffix(" px")
+        self.spin_max_size.setSpecialValueText(self.lang_manager.get('original_size'))
+        self.spin_max_size.setValue(int(self.settings.load_setting('convert_max_size', 0)))
+        self.spin_max_size.valueChanged.connect(lambda v: self.settings.save_setting('convert_max_size', v))
+        h_max_size.addWidget(self.spin_max_size)
+        l_conv.addLayout(h_max_size)
+        h_profile = QHBoxLayout()
+        self.lbl_profile = QLabel(self.lang_manager.get('encoder_profile'))
+        h_profile.addWidget(self.lbl_profile)
+        self.combo_profile = QComboBox()
+        for key in PROFILES:
+            self.combo_profile.addItem(self.lang_manager.get(f'profile_{key}'), key)
+        idx = self.combo_profile.findData(self.settings.load_setting('convert_profile', DEFAULT_PROFILE))
+        if idx >= 0: self.combo_profile.setCurrentIndex(idx)
+        self.combo_profile.currentIndexChanged.connect(lambda _: self.settings.save_setting('convert_profile', self.combo_profile.currentData()))
+        h_profile.addWidget(self.combo_profile)
+        self.btn_benchmark = QPushButton(self.lang_manager.get('benchmark_btn'))
+        self.btn_benchmark.clicked.connect(self.run_encoder_benchmark)
+        h_profile.addWidget(self.btn_benchmark)
+        l_conv.addLayout(h_profile)
         h_conf_conv = QHBoxLayout()
         self.lbl_conf_conv = QLabel(self.lang_manager.get('conflict'))
         h_conf_conv.addWidget(self.lbl_conf_conv)
@@ -352,15 +466,34 @@ class MainWindow(QMainWindow):
         self.lbl_org_desc.setText(self.lang_manager.get('organize_desc'))
         self.lbl_mode.setText(self.lang_manager.get('mode'))
         self.lbl_conf_org.setText(self.lang_manager.get('conflict'))
+        self.chk_verify_moves.setText(self.lang_manager.get('verify_moves'))
         self.btn_run_org.setText(self.lang_manager.get('start_organize'))
+        self.btn_preview_org.setText(self.lang_manager.get('preview_organize'))
+        self.btn_undo_org.setText(self.lang_manager.get('undo_organize'))
         self.tabs.setTabText(0, self.lang_manager.get('organize'))
         
         self.lbl_clean_desc.setText(self.lang_manager.get('clean_desc'))
         self.lbl_conf_clean.setText(self.lang_manager.get('conflict'))
+        self.lbl_hash_workers.setText(self.lang_manager.get('hash_workers'))
+        self.lbl_dedup_action.setText(self.lang_manager.get('dedup_action'))
+        self.lbl_hash_algo.setText(self.lang_manager.get('hash_algorithm'))
+        self.chk_similar.setText(self.lang_manager.get('similar_images'))
+        self.lbl_similar_threshold.setText(self.lang_manager.get('similar_threshold'))
+        self.chk_reference.setText(self.lang_manager.get('reference_mode'))
+        self.btn_ref_add.setText(self.lang_manager.get('reference_add'))
+        self.btn_ref_clear.setText(self.lang_manager.get('reference_clear'))
+        self.btn_ref_index.setText(self.lang_manager.get('reference_index'))
+        self.set_reference_libraries(self.reference_libraries())
         self.btn_clean.setText(self.lang_manager.get('clean_duplicates'))
+        self.btn_dup_report.setText(self.lang_manager.get('dup_report_btn'))
+        self.btn_apply_report.setText(self.lang_manager.get('apply_report_btn'))
         self.tabs.setTabText(1, self.lang_manager.get('clean'))
         
         self.lbl_conv_desc.setText(self.lang_manager.get('convert_desc'))
+        self.lbl_max_size.setText(self.lang_manager.get('max_size'))
+        self.spin_max_size.setSpecialValueText(self.lang_manager.get('original_size'))
+        self.lbl_profile.setText(self.lang_manager.get('encoder_profile'))
+        self.btn_benchmark.setText(self.lang_manager.get('benchmark_btn'))
         self.lbl_target.setText(self.lang_manager.get('target'))
         self.lbl_conf_conv.setText(self.lang_manager.get('conflict'))
         self.btn_conv.setText(self.lang_manager.get('convert_btn'))
@@ -400,10 +533,14 @@ class MainWindow(QMainWindow):
         update_combo_items(self.combo_conf_conv, conflict_keys)
         update_combo_items(self.combo_conf_priv, conflict_keys)
         update_combo_items(self.combo_conf_fix, conflict_keys)
+        for i, key in enumerate(['dedup_move', 'dedup_hardlink', 'dedup_reflink']):
+            self.combo_dedup_action.setItemText(i, self.lang_manager.get(key))
 
         # 2. Düzenleme Modu (Organize Mode) ComboBox'ı
         org_mode_keys = ['by_day', 'by_month', 'by_year']
         update_combo_items(self.combo_org, org_mode_keys)
+        for i in range(self.combo_profile.count()):
+            self.combo_profile.setItemText(i, self.lang_manager.get(f'profile_{self.combo_profile.itemData(i)}'))
     
     def on_tree_clicked(self, index):
         path = self.file_tree.model.filePath(index)
@@ -425,6 +562,7 @@ class MainWindow(QMainWindow):
         if self.analyzer is not None and self.analyzer.isRunning():
             self.analyzer.requestInterruption()
             self.analyzer.wait()
+        self.live_watcher.stop()
 
         self.current_folder = folder
         self.lbl_folder.setText(self.lang_manager.get('selected').format(folder))
@@ -436,12 +574,37 @@ class MainWindow(QMainWindow):
         self.file_tree.setCurrentIndex(idx)
         self.file_tree.expand(idx)
 
+        # Show what the catalog remembers right away; the analyzer refreshes it.
+        catalog = open_catalog()
+        if catalog is not None:
+            try:
+                cached = catalog.folder_stats(folder)
+            except Exception:
+                cached = None
+            finally:
+                catalog.close()
+            if cached:
+                self.show_stats(cached)
+
         self.analyzer = AnalyzerWorker(folder)
+        self.analyzer.partial_signal.connect(self.show_partial_stats)
         self.analyzer.finished_signal.connect(self.update_dashboard)
+        self.analyzer.snapshot_signal.connect(self.start_live_updates)
         self.analyzer.start()
+
+    def start_live_updates(self, folder, entries, dirs):
+        # Ignore snapshots from an analyzer that was superseded by another load.
+        if self.current_folder and folder == str(Path(self.current_folder)):
+            self.live_watcher.start(folder, entries, dirs)
     
     def refresh_folder(self):
-        if self.current_folder: self.load_folder(self.current_folder)
+        if not self.current_folder:
+            return
+        # The watcher already tracks changes; only rescan if it isn't running.
+        if self.live_watcher.is_watching(str(Path(self.current_folder))):
+            self.live_watcher.flush()
+        else:
+            self.load_folder(self.current_folder)
 
     def open_batch_rename(self):
         if not self.current_folder:
@@ -486,14 +649,65 @@ class MainWindow(QMainWindow):
         self.txt_log.clear()
         self.worker.start()
 
-    def run_organizer(self):
-        self.connect_worker(OrganizerWorker(self.current_folder, self.combo_org.currentData() or self.combo_org.currentText(), self.combo_conf_org.currentData() or self.combo_conf_org.currentText(), self.lang_manager))
+    def run_organizer(self, dry_run=False):
+        resume = False
+        interrupted = None if dry_run else interrupted_run(self.current_folder)
+        if interrupted:
+            question = 'resume_undo_question' if interrupted == 'undo' else 'resume_question'
+            answer = QMessageBox.question(self, self.lang_manager.get('resume_title'), self.lang_manager.get(question),
+                                          QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
+            if answer == QMessageBox.Cancel: return
+            if answer == QMessageBox.Yes and interrupted == 'undo':
+                self.run_organizer_undo()
+                return
+            resume = answer == QMessageBox.Yes
+        self.connect_worker(OrganizerWorker(self.current_folder, self.combo_org.currentData() or self.combo_org.currentText(), self.combo_conf_org.currentData() or self.combo_conf_org.currentText(), self.lang_manager, dry_run=dry_run, resume=resume, verify=self.chk_verify_moves.isChecked()))
+
+    def run_organizer_undo(self):
+        self.connect_worker(OrganizerWorker(self.current_folder, None, None, self.lang_manager, undo=True, verify=self.chk_verify_moves.isChecked()))
+
+    def run_organizer_preview(self):
+        self.run_organizer(dry_run=True)
     
     def run_cleaner(self):
-        self.connect_worker(CleanerWorker(self.current_folder, self.combo_conf_clean.currentData() or self.combo_conf_clean.currentText(), self.lang_manager))
+        self.start_cleaner()
+
+    def start_cleaner(self, report_path=None, apply_report=None):
+        self.connect_worker(CleanerWorker(self.current_folder, self.combo_conf_clean.currentData() or self.combo_conf_clean.currentText(), self.lang_manager, hash_workers=self.spin_hash_workers.value(), hash_algorithm=self.combo_hash_algo.currentText(), action=self.combo_dedup_action.currentData() or 'move', similar=self.chk_similar.isChecked(), similar_threshold=self.spin_similar_threshold.value(), report_path=report_path, apply_report=apply_report, reference_roots=self.reference_libraries() if self.chk_reference.isChecked() else None))
+
+    def reference_libraries(self):
+        saved = self.settings.load_setting('reference_libraries', '') or ''
+        return [p for p in str(saved).split(os.pathsep) if p]
+
+    def set_reference_libraries(self, paths):
+        self.settings.save_setting('reference_libraries', os.pathsep.join(paths))
+        self.lbl_reference_paths.setText(", ".join(os.path.basename(p) or p for p in paths) or self.lang_manager.get('reference_none'))
+        self.lbl_reference_paths.setToolTip("\n".join(paths))
+        self.chk_reference.setEnabled(bool(paths))
+        self.btn_ref_index.setEnabled(bool(paths))
+        if not paths: self.chk_reference.setChecked(False)
+
+    def add_reference_library(self):
+        folder = QFileDialog.getExistingDirectory(self, self.lang_manager.get('reference_add'))
+        if folder and folder not in self.reference_libraries():
+            self.set_reference_libraries(self.reference_libraries() + [folder])
+
+    def run_reference_index(self):
+        self.connect_worker(ReferenceIndexWorker(self.reference_libraries(), self.lang_manager, hash_workers=self.spin_hash_workers.value(), hash_algorithm=self.combo_hash_algo.currentText()))
+
+    def run_dup_report(self):
+        path, _ = QFileDialog.getSaveFileName(self, self.lang_manager.get('dup_report_btn'), "duplicates.json", "JSON (*.json);;CSV (*.csv)")
+        if path: self.start_cleaner(report_path=path)
+
+    def run_apply_report(self):
+        path, _ = QFileDialog.getOpenFileName(self, self.lang_manager.get('apply_report_btn'), "", "JSON/CSV (*.json *.csv)")
+        if path: self.start_cleaner(apply_report=path)
     
     def run_converter(self):
-        self.connect_worker(ConverterWorker(self.current_folder, self.combo_fmt.currentText(), self.combo_conf_conv.currentData() or self.combo_conf_conv.currentText(), self.lang_manager))
+        self.connect_worker(ConverterWorker(self.current_folder, self.combo_fmt.currentText(), self.combo_conf_conv.currentData() or self.combo_conf_conv.currentText(), self.lang_manager, max_size=self.spin_max_size.value(), profile=self.combo_profile.currentData()))
+
+    def run_encoder_benchmark(self):
+        self.connect_worker(EncoderBenchmarkWorker(self.current_folder, self.combo_fmt.currentText(), self.lang_manager, max_size=self.spin_max_size.value()))
     
     def run_privacy(self):
         self.connect_worker(PrivacyWorker(self.current_folder, self.combo_conf_priv.currentData() or self.combo_conf_priv.currentText(), self.lang_manager))
@@ -526,11 +740,24 @@ class MainWindow(QMainWindow):
 
         self.txt_log.verticalScrollBar().setValue(self.txt_log.verticalScrollBar().maximum())
     
-    def update_dashboard(self, stats):
+    def show_stats(self, stats):
         self.card_total.set_value(stats["images"] + stats["videos"] + stats["others"])
         self.card_img.set_value(stats["images"])
         self.card_vid.set_value(stats["videos"])
         self.card_size.set_value(f"{stats['size_mb']} MB")
+
+    def show_partial_stats(self, stats):
+        self.show_stats(stats)
+        eta = stats.get("eta")
+        if eta is None:
+            self.status_bar.showMessage(self.lang_manager.get('scan_progress').format(stats["files"]))
+        else:
+            eta = int(eta)
+            self.status_bar.showMessage(self.lang_manager.get('scan_progress_eta').format(stats["files"], f"{eta // 60}:{eta % 60:02d}"))
+
+    def update_dashboard(self, stats):
+        self.status_bar.clearMessage()
+        self.show_stats(stats)
         self.log(self.lang_manager.get('analysis_updated'))
     
     def dragEnterEvent(self, event):
@@ -554,6 +781,7 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         self.settings.save_setting('window_geometry', self.saveGeometry())
         if self.current_folder: self.settings.save_setting('last_used_folder', self.current_folder)
+        self.live_watcher.shutdown()
         event.accept()
 
 def global_exception_handler(exctype, value, tb):
@@ -569,6 +797,8 @@ def global_exception_handler(exctype, value, tb):
     msg.exec()
 
 if __name__ == "__main__":
+    # Lets frozen (PyInstaller) builds start the converter's worker processes.
+    multiprocessing.freeze_support()
     sys.excepthook = global_exception_handler
 
     app = QApplication(sys.argv)
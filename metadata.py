@@ -0,0 +1,333 @@
+"""Header-only capture date parsing.
+
+Reads just the bytes that hold the date instead of decoding files:
+
+- JPEG: walks the marker segments (seeking over large ICC/comment segments)
+  to APP1 "Exif".
+- TIFF: follows IFD0 -> Exif IFD by seeking.
+- PNG: the eXIf chunk before the image data.
+- MP4/MOV (ISO-BMFF): walks box headers by seeking to `moov` (wherever it
+  is in the file) and reads the QuickTime creation date keys, `©day`, or
+  the `mvhd` creation time. Multi-GB clips cost a handful of small reads.
+
+DateTimeOriginal (falling back to DateTimeDigitized) is combined with
+SubSecTimeOriginal and OffsetTimeOriginal when present. Results are
+memoized per (path, size, mtime), so repeated lookups in one session are free.
+"""
+import datetime
+import functools
+import os
+import struct
+from typing import Callable, Optional
+
+HEADER_BYTES = 64 * 1024
+MEMO_SIZE = 65536
+
+# TIFF/EXIF tags
+_EXIF_IFD = 0x8769
+_DATETIME_ORIGINAL = 0x9003
+_DATETIME_DIGITIZED = 0x9004
+_OFFSET_TIME_ORIGINAL = 0x9011
+_OFFSET_TIME_DIGITIZED = 0x9012
+_SUBSEC_ORIGINAL = 0x9291
+_SUBSEC_DIGITIZED = 0x9292
+
+_ASCII = 2
+_MAX_IFD_ENTRIES = 512
+
+# ISO-BMFF
+_MP4_EPOCH = datetime.datetime(1904, 1, 1, tzinfo=datetime.timezone.utc)
+_BMFF_TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot", b"uuid"}
+# Image formats that share the container (read by PIL/pillow-heif instead).
+_BMFF_IMAGE_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"mif1", b"msf1", b"avif", b"avis"}
+_QT_CREATION_KEY = b"com.apple.quicktime.creationdate"
+_MAX_META_BYTES = 1024 * 1024
+
+
+class UnsupportedFormat(ValueError):
+    """The file isn't in a format this module can parse (use a full decoder)."""
+
+
+def _parse_datetime(value: str, subsec: Optional[str], offset: Optional[str]) -> Optional[datetime.datetime]:
+    try:
+        dt = datetime.datetime.strptime(value.strip()[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+    if subsec and subsec.strip().isdigit():
+        digits = subsec.strip()[:6]
+        dt = dt.replace(microsecond=int(digits.ljust(6, "0")))
+    if offset and len(offset) >= 6 and offset[0] in "+-":
+        try:
+            hours, minutes = int(offset[1:3]), int(offset[4:6])
+            delta = datetime.timedelta(hours=hours, minutes=minutes)
+            dt = dt.replace(tzinfo=datetime.timezone(-delta if offset[0] == "-" else delta))
+        except ValueError:
+            pass
+    return dt
+
+
+def _read_ifd(read_at: Callable[[int, int], bytes], endian: str, offset: int, wanted: set) -> dict:
+    """ASCII/pointer values of `wanted` tags in the IFD at `offset`."""
+    head = read_at(offset, 2)
+    if len(head) < 2:
+        return {}
+    (count,) = struct.unpack(endian + "H", head)
+    count = min(count, _MAX_IFD_ENTRIES)
+    data = read_at(offset + 2, count * 12)
+    values = {}
+    for i in range(len(data) // 12):
+        tag, typ, n, raw = struct.unpack(endian + "HHI4s", data[i * 12:i * 12 + 12])
+        if tag not in wanted:
+            continue
+        if tag == _EXIF_IFD:
+            values[tag] = struct.unpack(endian + "I", raw)[0]
+        elif typ == _ASCII:
+            text = raw[:n] if n <= 4 else read_at(struct.unpack(endian + "I", raw)[0], n)
+            values[tag] = text.split(b"\0", 1)[0].decode("ascii", "replace")
+    return values
+
+
+def _tiff_datetime(read_at: Callable[[int, int], bytes]) -> Optional[datetime.datetime]:
+    """Date from a TIFF structure; offsets are relative to its header."""
+    header = read_at(0, 8)
+    if header[:4] == b"II*\0":
+        endian = "<"
+    elif header[:4] == b"MM\0*":
+        endian = ">"
+    else:
+        raise UnsupportedFormat("not a TIFF header")
+    (ifd0,) = struct.unpack(endian + "I", header[4:8])
+    ifd = _read_ifd(read_at, endian, ifd0, {_EXIF_IFD})
+    if _EXIF_IFD not in ifd:
+        return None
+    exif = _read_ifd(read_at, endian, ifd[_EXIF_IFD], {
+        _DATETIME_ORIGINAL, _DATETIME_DIGITIZED, _OFFSET_TIME_ORIGINAL,
+        _OFFSET_TIME_DIGITIZED, _SUBSEC_ORIGINAL, _SUBSEC_DIGITIZED,
+    })
+    for date_tag, sub_tag, off_tag in (
+        (_DATETIME_ORIGINAL, _SUBSEC_ORIGINAL, _OFFSET_TIME_ORIGINAL),
+        (_DATETIME_DIGITIZED, _SUBSEC_DIGITIZED, _OFFSET_TIME_DIGITIZED),
+    ):
+        if exif.get(date_tag):
+            dt = _parse_datetime(exif[date_tag], exif.get(sub_tag), exif.get(off_tag))
+            if dt is not None:
+                return dt
+    return None
+
+
+def _buffer_reader(buf: bytes) -> Callable[[int, int], bytes]:
+    return lambda offset, n: buf[offset:offset + n]
+
+
+def _jpeg_datetime(f) -> Optional[datetime.datetime]:
+    """Walk the marker segments by seeking (only 4 bytes per segment header are read)."""
+    pos = 2
+    while True:
+        f.seek(pos)
+        header = f.read(4)
+        if len(header) < 4:
+            return None
+        if header[0] != 0xFF:
+            # Lost sync: let a full decoder have a go instead of guessing.
+            raise UnsupportedFormat("malformed JPEG segments")
+        marker = header[1]
+        if marker == 0xFF:  # padding
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):  # end of image / start of scan: no more metadata
+            return None
+        (length,) = struct.unpack(">H", header[2:4])
+        if marker == 0xE1 and length >= 8:
+            payload = f.read(length - 2)
+            if payload[:6] == b"Exif\0\0":
+                return _tiff_datetime(_buffer_reader(payload[6:]))
+        pos += 2 + length
+
+
+def _png_datetime(f) -> Optional[datetime.datetime]:
+    f.seek(8)
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        length, kind = struct.unpack(">I4s", chunk)
+        if kind == b"eXIf":
+            return _tiff_datetime(_buffer_reader(f.read(length)))
+        if kind in (b"IDAT", b"IEND"):
+            return None
+        f.seek(length + 4, os.SEEK_CUR)  # data + CRC
+
+
+def _parse_iso(value: str) -> Optional[datetime.datetime]:
+    """'2021-07-04T10:20:30+0200', '...Z', '2021-07-04' or '2021' as a datetime."""
+    value = value.strip().rstrip("\0")
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    if len(value) > 5 and value[-5] in "+-" and value[-4:].isdigit():
+        value = value[:-2] + ":" + value[-2:]
+    if len(value) == 4 and value.isdigit():
+        value += "-01-01"
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _boxes(f, start: int, end: int):
+    """(type, payload offset, payload size) of the boxes in [start, end)."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header)
+        offset = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            offset = 16
+        elif size == 0:
+            size = end - pos
+        if size < offset:
+            return
+        yield kind, pos + offset, size - offset
+        pos += size
+
+
+def _ilst_values(data: bytes, names: dict) -> dict:
+    """{name: text} of the items in an `ilst` payload; `names` maps item type -> name."""
+    values = {}
+    pos = 0
+    while pos + 8 <= len(data):
+        size, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        if size < 8:
+            break
+        name = names.get(kind)
+        inner = data[pos + 8:pos + size]
+        if name is not None and len(inner) >= 16 and inner[4:8] == b"data":
+            values[name] = inner[16:struct.unpack(">I", inner[:4])[0]].decode("utf-8", "replace")
+        pos += size
+    return values
+
+
+def _meta_values(meta: bytes) -> dict:
+    """Date strings from a `meta` box payload (QuickTime keys or iTunes-style ©day)."""
+    if meta[4:8] != b"hdlr":
+        meta = meta[4:]  # ISO flavour is a full box (version/flags first)
+    children = {}
+    pos = 0
+    while pos + 8 <= len(meta):
+        size, kind = struct.unpack(">I4s", meta[pos:pos + 8])
+        if size < 8:
+            break
+        children[kind] = meta[pos + 8:pos + size]
+        pos += size
+    names = {b"\xa9day": "day"}
+    keys = children.get(b"keys", b"")
+    if len(keys) >= 8:
+        (count,) = struct.unpack(">I", keys[4:8])
+        kpos = 8
+        for index in range(1, count + 1):
+            if kpos + 8 > len(keys):
+                break
+            (ksize,) = struct.unpack(">I", keys[kpos:kpos + 4])
+            if keys[kpos + 8:kpos + ksize] == _QT_CREATION_KEY:
+                names[struct.pack(">I", index)] = "creationdate"
+            kpos += max(ksize, 8)
+    return _ilst_values(children.get(b"ilst", b""), names)
+
+
+def _bmff_datetime(f, size: int) -> Optional[datetime.datetime]:
+    moov = None
+    for kind, offset, length in _boxes(f, 0, size):
+        if kind == b"ftyp":
+            f.seek(offset)
+            if f.read(4) in _BMFF_IMAGE_BRANDS:
+                raise UnsupportedFormat("ISO-BMFF image")
+        elif kind == b"moov":
+            moov = (offset, length)
+            break
+    if moov is None:
+        raise UnsupportedFormat("no moov box")
+
+    found = {}
+    mvhd = None
+    for kind, offset, length in _boxes(f, moov[0], moov[0] + moov[1]):
+        if kind == b"mvhd":
+            f.seek(offset)
+            head = f.read(12)
+            if head[:1] == b"\x01":
+                mvhd = struct.unpack(">Q", head[4:12])[0]
+            else:
+                mvhd = struct.unpack(">I", head[4:8])[0]
+        elif kind == b"meta" and length <= _MAX_META_BYTES:
+            f.seek(offset)
+            found.update(_meta_values(f.read(length)))
+        elif kind == b"udta" and length <= _MAX_META_BYTES:
+            f.seek(offset)
+            udta = f.read(length)
+            pos = 0
+            while pos + 8 <= len(udta):
+                usize, ukind = struct.unpack(">I4s", udta[pos:pos + 8])
+                if usize < 8:
+                    break
+                body = udta[pos + 8:pos + usize]
+                if ukind == b"\xa9day" and len(body) > 4:
+                    # Classic QuickTime text atom: 16-bit length, 16-bit language, text.
+                    (tlen,) = struct.unpack(">H", body[:2])
+                    found.setdefault("day", body[4:4 + tlen].decode("utf-8", "replace"))
+                elif ukind == b"meta":
+                    found.update({k: v for k, v in _meta_values(body).items() if k not in found})
+                pos += usize
+
+    # Local capture time with offset first; mvhd is UTC and often the encode time.
+    for key in ("creationdate", "day"):
+        dt = _parse_iso(found.get(key, ""))
+        if dt is not None:
+            return dt
+    if mvhd:
+        dt = _MP4_EPOCH + datetime.timedelta(seconds=mvhd)
+        if dt.year >= 1970:
+            return dt.astimezone()
+    return None
+
+
+def _file_datetime(path) -> Optional[datetime.datetime]:
+    with open(path, "rb") as f:
+        head = f.read(HEADER_BYTES)
+        if head[:2] == b"\xff\xd8":
+            return _jpeg_datetime(f)
+        if head[:8] == b"\x89PNG\r\n\x1a\n":
+            return _png_datetime(f)
+        if head[:4] in (b"II*\0", b"MM\0*"):
+            def read_at(offset, n):
+                if offset + n <= len(head):
+                    return head[offset:offset + n]
+                f.seek(offset)
+                return f.read(n)
+            return _tiff_datetime(read_at)
+        if head[4:8] in _BMFF_TOP_LEVEL:
+            return _bmff_datetime(f, os.fstat(f.fileno()).st_size)
+    raise UnsupportedFormat(os.fspath(path))
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def _memo_datetime(path: str, size: int, mtime_ns: int) -> Optional[datetime.datetime]:
+    return _file_datetime(path)
+
+
+def capture_datetime(path, stat_result=None) -> Optional[datetime.datetime]:
+    """Capture date from the file's own metadata, or None if it has none.
+
+    Raises UnsupportedFormat for formats without a header parser here (HEIC,
+    WebP, ...) so callers can fall back to a full decoder; corrupt headers
+    and unreadable files give None.
+    """
+    path = os.fspath(path)
+    try:
+        st = stat_result or os.stat(path)
+        return _memo_datetime(path, st.st_size, st.st_mtime_ns)
+    except UnsupportedFormat:
+        raise
+    except (OSError, ValueError, struct.error):
+        return None
@@ -0,0 +1,170 @@
+"""Two-phase organizer: plan every move first, then execute them in bulk.
+
+Planning reads capture dates on a thread pool and resolves name conflicts
+against an in-memory listing of each target folder, so it touches the disk
+once per folder instead of several times per file. Execution creates each
+folder once and moves with `os.rename` (a metadata-only operation on the same
+filesystem); moves across devices are streamed by `transfer.TransferQueue`.
+
+A plan can be shown as a dry-run preview without moving anything.
+"""
+import datetime
+import errno
+import os
+import shutil
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from hashing import HashEngine
+from transfer import DEFAULT_TRANSFER_WORKERS, SourceHash, TransferQueue
+from utils import numbered_name
+
+DEFAULT_PLAN_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+
+class PlannedMove(NamedTuple):
+    src: str
+    dst: str
+    # 'move', 'overwrite' (replace an existing file) or 'skip'
+    action: str
+
+
+def folder_name(date_str: str, mode) -> Optional[str]:
+    """Target folder for a 'YYYY-MM-DD' date in the given organize mode."""
+    try:
+        dt = datetime.datetime.strptime(date_str, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+    if mode in ('by_year', 'year') or (isinstance(mode, str) and ('Year' in mode or 'Yıla' in mode)):
+        return dt.strftime('%Y')
+    if mode in ('by_month', 'month') or (isinstance(mode, str) and ('Month' in mode or 'Aya' in mode)):
+        return dt.strftime('%Y-%m')
+    return date_str
+
+
+def build_plan(
+    root,
+    entries: Iterable,
+    date_of: Callable,
+    mode,
+    conflict: str,
+    workers: int = DEFAULT_PLAN_WORKERS,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> List[PlannedMove]:
+    """Moves that organize `entries` (scanner entries) into date folders under `root`.
+
+    `date_of(entry)` returns 'YYYY-MM-DD' or None and runs on `workers`
+    threads. `conflict` is a mode code ('overwrite', 'skip' or 'copy').
+    Files already in place are left out of the plan.
+    """
+    root = os.fspath(root)
+    entries = list(entries)
+    listings: Dict[str, Set[str]] = {}
+    plan: List[PlannedMove] = []
+    total = len(entries) or 1
+
+    def names_in(directory: str) -> Set[str]:
+        names = listings.get(directory)
+        if names is None:
+            try:
+                names = {os.path.normcase(n) for n in os.listdir(directory)}
+            except OSError:
+                names = set()
+            listings[directory] = names
+        return names
+
+    engine = HashEngine(workers=workers)
+    for n, (entry, date_str) in enumerate(engine.map(entries, date_of, should_stop=should_stop), 1):
+        if on_progress is not None and n % 256 == 0:
+            on_progress(n / total)
+        folder = folder_name(date_str, mode) if date_str else None
+        if folder is None:
+            continue
+        target_dir = os.path.join(root, folder)
+        dst = os.path.join(target_dir, entry.name)
+        if dst == entry.path:
+            continue
+        taken = names_in(target_dir)
+        action = 'move'
+        if os.path.normcase(entry.name) in taken:
+            if conflict == 'skip':
+                plan.append(PlannedMove(entry.path, dst, 'skip'))
+                continue
+            if conflict == 'overwrite':
+                action = 'overwrite'
+            else:
+                dst = os.path.join(target_dir, numbered_name(entry.name, taken))
+        taken.add(os.path.normcase(os.path.basename(dst)))
+        plan.append(PlannedMove(entry.path, dst, action))
+    return plan
+
+
+def execute_plan(
+    plan: Iterable[PlannedMove],
+    on_moved: Optional[Callable[[int, PlannedMove], None]] = None,
+    on_error: Optional[Callable[[int, PlannedMove, Exception], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+    transfer_workers: int = DEFAULT_TRANSFER_WORKERS,
+    verify: Optional[str] = None,
+    source_hash: Optional[SourceHash] = None,
+) -> bool:
+    """Carry out the 'move'/'overwrite' steps of a plan. Returns False if stopped early.
+
+    Same-device moves are renames done in order. Moves that cross devices go
+    to a `TransferQueue` (`transfer_workers` copies at once, checksum-checked
+    with the `verify` algorithm if given, sources hashed through `source_hash`
+    if given); their callbacks fire as they finish.
+    Callbacks get the step's index in `plan` first, since several steps can
+    share a source or destination path.
+    """
+    steps = [(i, m) for i, m in enumerate(plan) if m.action != 'skip']
+    made: Set[str] = set()
+    total = len(steps) or 1
+    done = 0
+    transfers = TransferQueue(transfer_workers, verify, source_hash)
+
+    def report(step: Tuple[int, PlannedMove], error: Optional[Exception]) -> None:
+        nonlocal done
+        done += 1
+        i, move = step
+        if error is None:
+            if on_moved is not None:
+                on_moved(i, move)
+        elif on_error is not None:
+            on_error(i, move, error)
+        if on_progress is not None and done % 64 == 0:
+            on_progress(done / total)
+
+    try:
+        for step in steps:
+            move = step[1]
+            if should_stop is not None and should_stop():
+                for queued, error in transfers.drain(cancel=True):
+                    report(queued, error)
+                return False
+            try:
+                target_dir = os.path.dirname(move.dst)
+                if target_dir not in made:
+                    os.makedirs(target_dir, exist_ok=True)
+                    made.add(target_dir)
+                if move.action == 'overwrite' and os.path.isdir(move.dst):
+                    shutil.rmtree(move.dst)
+                try:
+                    # os.replace: same as rename, but also overwrites on Windows.
+                    os.replace(move.src, move.dst)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    for queued, error in transfers.submit(move.src, move.dst, step):
+                        report(queued, error)
+                    continue
+            except Exception as e:
+                report(step, e)
+                continue
+            report(step, None)
+        for queued, error in transfers.drain():
+            report(queued, error)
+    finally:
+        transfers.close()
+    return True
@@ -0,0 +1,354 @@
+"""Perceptual near-duplicate image detection.
+
+Finds the same picture saved in another format (JPEG/PNG/WebP), re-compressed
+or resized, which byte-level duplicate detection can't see.
+
+- Images are decoded straight to a small grayscale thumbnail (JPEG DCT
+  scaling via `draft()`), on the hashing engine's thread pool.
+- With NumPy, 64-bit pHashes are computed for whole batches at once with a
+  matrix DCT; without it, a pure-Python dHash is used instead.
+- Matching goes through a multi-index Hamming table (`HammingIndex`), so the
+  grouping does not compare every pair of images.
+
+Videos (optional OpenCV): a fixed number of frames at evenly spaced points of
+the clip are seeked to and pHashed, so re-muxed or re-encoded copies match
+without decoding whole files. Clips are only compared with clips of about
+the same duration.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from hashing import HashEngine
+
+try:
+    import numpy as np  # type: ignore
+    NUMPY_AVAILABLE = True
+except Exception:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    import cv2  # type: ignore
+    CV2_AVAILABLE = NUMPY_AVAILABLE
+except Exception:
+    cv2 = None
+    CV2_AVAILABLE = False
+
+DEFAULT_THRESHOLD = 6
+PHASH_SIZE = 32
+BATCH_SIZE = 256
+
+# Frames sampled per video and allowed duration mismatch between copies.
+VIDEO_FRAMES = 8
+VIDEO_ALGORITHM = "vsig%d" % VIDEO_FRAMES
+DURATION_TOLERANCE = 0.02
+
+
+def hash_algorithm() -> str:
+    """Name under which hashes from this build are cached ('phash' or 'dhash')."""
+    return "phash" if NUMPY_AVAILABLE else "dhash"
+
+
+def load_thumbnail(path, size: Tuple[int, int]) -> Optional[Tuple[bytes, int]]:
+    """Grayscale thumbnail bytes of `size` and the original pixel count, or None."""
+    try:
+        with Image.open(path) as img:
+            pixels = img.width * img.height
+            # JPEG: decode at 1/2..1/8 scale directly; other formats ignore this.
+            img.draft("L", (size[0] * 4, size[1] * 4))
+            thumb = img.convert("L").resize(size, Image.Resampling.BILINEAR)
+            return thumb.tobytes(), pixels
+    except Exception:
+        return None
+
+
+def _dhash(thumb: bytes) -> int:
+    """Difference hash of a 9x8 thumbnail."""
+    value = 0
+    for row in range(8):
+        base = row * 9
+        for col in range(8):
+            value = (value << 1) | (thumb[base + col] > thumb[base + col + 1])
+    return value
+
+
+_dct_cache = {}
+
+
+def _dct_matrix(n: int):
+    if n not in _dct_cache:
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+        m[0] /= np.sqrt(2.0)
+        _dct_cache[n] = m.astype(np.float32)
+    return _dct_cache[n]
+
+
+def phash_batch(thumbs: List[bytes]) -> List[int]:
+    """pHash of many PHASH_SIZE x PHASH_SIZE thumbnails in one vectorized pass."""
+    if not thumbs:
+        return []
+    n = PHASH_SIZE
+    x = np.frombuffer(b"".join(thumbs), dtype=np.uint8).reshape(len(thumbs), n, n).astype(np.float32)
+    d = _dct_matrix(n)
+    coeffs = (d @ x @ d.T)[:, :8, :8].reshape(len(thumbs), 64)
+    median = np.median(coeffs[:, 1:], axis=1, keepdims=True)  # skip the DC term
+    packed = np.packbits(coeffs > median, axis=1)
+    return [int.from_bytes(row.tobytes(), "big") for row in packed]
+
+
+class HammingIndex:
+    """Multi-index hashing over 64-bit keys.
+
+    Keys are split into `chunks` parts. If two keys are within `threshold`
+    bits, at least one part differs by at most threshold // chunks bits
+    (pigeonhole), so a query only probes those neighbourhoods of each part
+    instead of scanning everything.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD, bits: int = 64, chunks: int = 4):
+        self.threshold = threshold
+        self.chunks = chunks
+        self.chunk_bits = bits // chunks
+        self.mask = (1 << self.chunk_bits) - 1
+        self.tables: List[Dict[int, List[Tuple[int, object]]]] = [{} for _ in range(chunks)]
+        self.flips = self._flip_masks(self.chunk_bits, threshold // chunks)
+
+    @staticmethod
+    def _flip_masks(bits: int, radius: int) -> List[int]:
+        masks = [0]
+        frontier = [(0, -1)]
+        for _ in range(radius):
+            nxt = []
+            for m, last in frontier:
+                for b in range(last + 1, bits):
+                    nxt.append((m | (1 << b), b))
+            masks.extend(m for m, _ in nxt)
+            frontier = nxt
+        return masks
+
+    def _parts(self, key: int):
+        for i in range(self.chunks):
+            yield i, (key >> (i * self.chunk_bits)) & self.mask
+
+    def add(self, key: int, value) -> None:
+        for i, part in self._parts(key):
+            self.tables[i].setdefault(part, []).append((key, value))
+
+    def query(self, key: int) -> List[Tuple[object, int]]:
+        """(value, distance) for every stored key within `threshold` bits."""
+        found = {}
+        for i, part in self._parts(key):
+            table = self.tables[i]
+            for flip in self.flips:
+                for other, value in table.get(part ^ flip, ()):
+                    if id(value) in found:
+                        continue
+                    dist = (other ^ key).bit_count()
+                    if dist <= self.threshold:
+                        found[id(value)] = (value, dist)
+        return list(found.values())
+
+
+def compute_hashes(
+    entries: Iterable,
+    engine: Optional[HashEngine] = None,
+    cached: Optional[Callable] = None,
+    store: Optional[Callable] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Dict[int, Tuple[object, int, int]]:
+    """Perceptual hash for each image: {id(entry): (entry, hash, pixels)}.
+
+    `cached(entry)` / `store(entry, value)` plug in a persistent cache; values
+    are stored as '<hash hex>:<pixel count>'.
+    """
+    entries = list(entries)
+    engine = engine or HashEngine(workers=1)
+    result: Dict[int, Tuple[object, int, int]] = {}
+    todo = []
+    for e in entries:
+        value = cached(e) if cached is not None else None
+        if value:
+            h, _, px = value.partition(":")
+            result[id(e)] = (e, int(h, 16), int(px or 0))
+        else:
+            todo.append(e)
+
+    size = (PHASH_SIZE, PHASH_SIZE) if NUMPY_AVAILABLE else (9, 8)
+    total = len(todo) or 1
+    batch: List[Tuple[object, bytes, int]] = []
+
+    def flush():
+        if NUMPY_AVAILABLE:
+            hashes = phash_batch([t for _, t, _ in batch])
+        else:
+            hashes = [_dhash(t) for _, t, _ in batch]
+        for (e, _, px), h in zip(batch, hashes):
+            result[id(e)] = (e, h, px)
+            if store is not None:
+                store(e, f"{h:016x}:{px}")
+        batch.clear()
+
+    done = 0
+    for e, thumb in engine.map(todo, lambda e: load_thumbnail(e.path, size), should_stop=should_stop):
+        done += 1
+        if thumb is not None:
+            batch.append((e, thumb[0], thumb[1]))
+            if len(batch) >= BATCH_SIZE:
+                flush()
+        if on_progress is not None and done % 32 == 0:
+            on_progress(done / total)
+    flush()
+    return result
+
+
+def find_similar_groups(
+    entries: Iterable,
+    threshold: int = DEFAULT_THRESHOLD,
+    engine: Optional[HashEngine] = None,
+    cached: Optional[Callable] = None,
+    store: Optional[Callable] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> List[List]:
+    """Group images whose perceptual hashes are within `threshold` bits.
+
+    The first member of each group is the one to keep (most pixels, then
+    largest file); every other member is within `threshold` of it.
+    """
+    hashed = compute_hashes(entries, engine, cached, store, should_stop, on_progress)
+    index = HammingIndex(threshold)
+    pairs = []
+    for key, (_e, h, _px) in hashed.items():
+        pairs.extend((key, other) for other, _dist in index.query(h))
+        index.add(h, key)
+    return _groups(hashed, pairs, lambda m: (-m[2], -m[0].size, m[0].path))
+
+
+def _groups(items: Dict[int, tuple], pairs: Iterable[Tuple[int, int]], rank: Callable) -> List[List]:
+    """Groups built around a keeper (values start with the entry), best-ranked first.
+
+    Not connected components: a chain A~B~C would put C with A even when C is
+    far from A. Instead the best-ranked file not grouped yet becomes a keeper
+    and takes only its own direct matches, so every member of a group is
+    within the threshold of the file that is kept.
+    """
+    neighbours: Dict[int, set] = {}
+    for a, b in pairs:
+        neighbours.setdefault(a, set()).add(b)
+        neighbours.setdefault(b, set()).add(a)
+
+    assigned = set()
+    result = []
+    for key in sorted(neighbours, key=lambda k: rank(items[k])):
+        if key in assigned:
+            continue
+        members = [k for k in neighbours[key] if k not in assigned]
+        if not members:
+            continue
+        assigned.add(key)
+        assigned.update(members)
+        members.sort(key=lambda k: rank(items[k]))
+        result.append([items[key][0]] + [items[k][0] for k in members])
+    result.sort(key=lambda g: g[0].path)
+    return result
+
+
+# -- videos -----------------------------------------------------------------
+
+def video_signature(path, frames: int = VIDEO_FRAMES) -> Optional[Tuple[float, Tuple[int, ...]]]:
+    """(duration in seconds, pHash per sampled frame), or None if it can't be decoded.
+
+    Frames are taken at the middle of `frames` equal slices of the clip, so
+    leading/trailing black frames and container differences barely matter.
+    """
+    cap = cv2.VideoCapture(str(path))
+    try:
+        if not cap.isOpened():
+            return None
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        if count <= 0 or fps <= 0:
+            return None
+        thumbs = []
+        for i in range(frames):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(count * (i + 0.5) / frames))
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                continue
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            thumbs.append(cv2.resize(gray, (PHASH_SIZE, PHASH_SIZE), interpolation=cv2.INTER_AREA).tobytes())
+        if len(thumbs) < frames:
+            return None
+        return count / fps, tuple(phash_batch(thumbs))
+    except Exception:
+        return None
+    finally:
+        cap.release()
+
+
+def video_distance(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Mean Hamming distance between corresponding frame hashes."""
+    return sum((x ^ y).bit_count() for x, y in zip(a, b)) / max(1, len(a))
+
+
+def _encode_signature(sig) -> str:
+    return "%.3f:%s" % (sig[0], ",".join("%016x" % h for h in sig[1]))
+
+
+def _decode_signature(value: str):
+    duration, _, hashes = value.partition(":")
+    return float(duration), tuple(int(h, 16) for h in hashes.split(","))
+
+
+def find_similar_videos(
+    entries: Iterable,
+    threshold: int = DEFAULT_THRESHOLD,
+    engine: Optional[HashEngine] = None,
+    cached: Optional[Callable] = None,
+    store: Optional[Callable] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> List[List]:
+    """Group videos whose frame signatures differ by at most `threshold` bits per frame.
+
+    Decoding runs on `engine`'s threads (OpenCV releases the GIL while
+    decoding). `cached`/`store` work as in `compute_hashes`. The largest
+    file of each group comes first.
+    """
+    if not CV2_AVAILABLE:
+        return []
+    entries = list(entries)
+    engine = engine or HashEngine(workers=1)
+    sigs: Dict[int, tuple] = {}
+    todo = []
+    for e in entries:
+        value = cached(e) if cached is not None else None
+        if value:
+            sigs[id(e)] = (e,) + _decode_signature(value)
+        else:
+            todo.append(e)
+
+    total = len(todo) or 1
+    for n, (e, sig) in enumerate(engine.map(todo, lambda e: video_signature(e.path), should_stop=should_stop), 1):
+        if sig is not None:
+            sigs[id(e)] = (e,) + sig
+            if store is not None:
+                store(e, _encode_signature(sig))
+        if on_progress is not None and n % 4 == 0:
+            on_progress(n / total)
+
+    # Sweep by duration: only clips of about the same length are compared.
+    ordered = sorted(sigs.items(), key=lambda kv: kv[1][1])
+    pairs = []
+    for i, (key, (_e, duration, frames)) in enumerate(ordered):
+        limit = duration * (1 + DURATION_TOLERANCE) + 0.5
+        for other, (_o, other_duration, other_frames) in ordered[i + 1:]:
+            if other_duration > limit:
+                break
+            if video_distance(frames, other_frames) <= threshold:
+                pairs.append((key, other))
+    return _groups(sigs, pairs, lambda m: (-m[0].size, m[0].path))
@@ -0,0 +1,208 @@
+"""Fast directory walker shared by all workers.
+
+Built on `os.scandir` so the stat data that comes with each directory listing
+is reused instead of re-stat'ing every file through `Path` objects. Subtrees
+are listed concurrently on a thread pool, which matters a lot on network
+shares where every directory listing is a round trip.
+"""
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Directory listing is latency bound (especially on NAS/SMB), not CPU bound.
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+class FileEntry(NamedTuple):
+    """Compact description of a regular file found during a walk."""
+
+    path: str
+    name: str
+    ext: str  # lower-case, including the dot ('' if none)
+    size: int
+    mtime_ns: int
+    dev: int
+    ino: int
+
+
+class WalkProgress:
+    """Directory counters a running walk keeps up to date (for progress/ETA)."""
+
+    def __init__(self):
+        self.dirs_listed = 0
+        self.dirs_found = 1  # the root
+
+    @property
+    def dirs_pending(self) -> int:
+        return self.dirs_found - self.dirs_listed
+
+    def eta(self, elapsed: float, estimated_dirs: Optional[float] = None) -> Optional[float]:
+        """Seconds left, from the directory listing rate so far.
+
+        `estimated_dirs` (see `estimate_dir_count`) accounts for directories
+        not discovered yet; without it only the known backlog is counted.
+        """
+        if self.dirs_listed == 0 or elapsed <= 0:
+            return None
+        remaining = self.dirs_pending
+        if estimated_dirs:
+            remaining = max(remaining, estimated_dirs - self.dirs_listed)
+        return remaining * elapsed / self.dirs_listed
+
+
+def _entry_from_dirent(entry: os.DirEntry) -> Optional[FileEntry]:
+    try:
+        if not entry.is_file():
+            return None
+        st = entry.stat()
+    except OSError:
+        return None
+    name = entry.name
+    ext = os.path.splitext(name)[1].lower()
+    return FileEntry(entry.path, name, ext, st.st_size, st.st_mtime_ns, st.st_dev, st.st_ino)
+
+
+def _scan_dir(
+    path: str,
+    exts: Optional[frozenset],
+    on_error: Optional[Callable[[str, OSError], None]],
+    prune: Optional[Callable[[str, bool], bool]] = None,
+) -> Tuple[List[FileEntry], List[str]]:
+    """List a single directory. Returns (files, subdirectories)."""
+    files: List[FileEntry] = []
+    subdirs: List[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    # Don't follow directory symlinks: avoids loops and double counting.
+                    if entry.is_dir(follow_symlinks=False):
+                        if prune is None or not prune(entry.path, True):
+                            subdirs.append(entry.path)
+                        continue
+                except OSError:
+                    continue
+                if exts is not None and os.path.splitext(entry.name)[1].lower() not in exts:
+                    continue
+                if prune is not None and prune(entry.path, False):
+                    continue
+                fe = _entry_from_dirent(entry)
+                if fe is not None:
+                    files.append(fe)
+    except OSError as e:
+        if on_error is not None:
+            on_error(path, e)
+    return files, subdirs
+
+
+def list_dir(path) -> Tuple[List[FileEntry], List[str]]:
+    """List a single directory (no recursion). Returns (files, subdirectories)."""
+    return _scan_dir(os.fspath(path), None, None)
+
+
+def iter_files(
+    root,
+    exts: Optional[Iterable[str]] = None,
+    recursive: bool = True,
+    max_workers: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_error: Optional[Callable[[str, OSError], None]] = None,
+    on_dir: Optional[Callable[[str], None]] = None,
+    progress: Optional[WalkProgress] = None,
+    prune: Optional[Callable[[str, bool], bool]] = None,
+) -> Iterator[FileEntry]:
+    """Yield every regular file below `root` as a `FileEntry`.
+
+    - `exts`: optional set of lower-case extensions (with dot) to keep.
+    - `should_stop`: polled between directories (e.g. `QThread.isInterruptionRequested`).
+    - `on_error`: called with (directory, exception) when a directory can't be listed.
+    - `on_dir`: called with every directory path that was listed, root included.
+    - `progress`: optional `WalkProgress` updated as directories are found/listed.
+    - `prune`: called with (path, is_dir); returning True skips the file, or
+      the whole subtree for a directory (see `ignore.load_rules`).
+
+    Order is not deterministic when `recursive` is True; sort if you care.
+    """
+    root = os.fspath(root)
+    ext_set = frozenset(e.lower() for e in exts) if exts is not None else None
+
+    if not recursive:
+        files, _ = _scan_dir(root, ext_set, on_error, prune)
+        if on_dir is not None:
+            on_dir(root)
+        if progress is not None:
+            progress.dirs_listed += 1
+        yield from files
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max_workers or DEFAULT_SCAN_WORKERS)
+    try:
+        first = pool.submit(_scan_dir, root, ext_set, on_error, prune)
+        pending = {first}
+        pending_dirs = {first: root}
+        while pending:
+            if should_stop is not None and should_stop():
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                listed = pending_dirs.pop(fut)
+                files, subdirs = fut.result()
+                if on_dir is not None:
+                    on_dir(listed)
+                if progress is not None:
+                    progress.dirs_listed += 1
+                    progress.dirs_found += len(subdirs)
+                for sub in subdirs:
+                    child = pool.submit(_scan_dir, sub, ext_set, on_error, prune)
+                    pending.add(child)
+                    pending_dirs[child] = sub
+                yield from files
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def list_files(root, exts: Optional[Iterable[str]] = None, **kwargs) -> List[FileEntry]:
+    """Like `iter_files`, but returns a list sorted by path (stable processing order)."""
+    files = list(iter_files(root, exts=exts, **kwargs))
+    files.sort(key=lambda e: e.path)
+    return files
+
+
+def estimate_dir_count(root, probes: int = 16, max_depth: int = 64, rng: Optional[random.Random] = None) -> float:
+    """Estimate how many directories are under `root` (root included).
+
+    Knuth's random-probe estimator: walk random root-to-leaf paths and sum the
+    products of the fan-outs seen along the way. Only a few dozen directory
+    listings are needed, so it's cheap enough to run next to a real walk and
+    drive a progress/ETA display.
+    """
+    rng = rng or random.Random()
+    cache = {}
+
+    def subdirs(path):
+        if path not in cache:
+            cache[path] = _scan_dir_names(path)
+        return cache[path]
+
+    root = os.fspath(root)
+    total = 0.0
+    for _ in range(max(1, probes)):
+        estimate, weight, current = 1.0, 1.0, root
+        for _ in range(max_depth):
+            children = subdirs(current)
+            if not children:
+                break
+            weight *= len(children)
+            estimate += weight
+            current = rng.choice(children)
+        total += estimate
+    return total / max(1, probes)
+
+
+def _scan_dir_names(path: str) -> List[str]:
+    try:
+        with os.scandir(path) as it:
+            return [e.path for e in it if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ignore import IgnoreRules, compile_pattern  # noqa: E402
+
+ROOT = os.path.abspath("root")
+
+
+def _path(rel):
+    return os.path.join(ROOT, *rel.split("/"))
+
+
+def test_anchored_dir_rule_matches_top_level_only():
+    rules = IgnoreRules(ROOT, ["/cache/"])
+    assert rules(_path("cache"), True)
+    assert not rules(_path("photos/cache"), True)
+    assert not rules(_path("cache"), False)
+
+
+def test_unanchored_dir_rule_matches_at_any_depth():
+    rules = IgnoreRules(ROOT, ["cache/"])
+    assert rules(_path("cache"), True)
+    assert rules(_path("photos/cache"), True)
+    assert not rules(_path("photos/cache"), False)
+
+
+def test_anchored_dir_rule_with_negation():
+    rules = IgnoreRules(ROOT, ["/cache/", "!keep"])
+    assert rules.rules is not None
+    assert rules(_path("cache"), True)
+    assert not rules(_path("photos/cache"), True)
+
+
+def test_compile_pattern_flags():
+    rx, negate, dir_only = compile_pattern("/cache/")
+    assert (negate, dir_only) == (False, True)
+    assert rx.match("cache") and not rx.match("photos/cache")
+    assert compile_pattern("/") is None
@@ -0,0 +1,160 @@
+"""Moves that work across filesystems at disk speed.
+
+A rename can't cross devices, and `shutil.move` then copies through Python
+one file at a time. `move_file` copies with the kernel's copy paths
+(`os.copy_file_range`, then `os.sendfile`, plain reads only as a last resort)
+into a temporary name next to the target, optionally compares checksums,
+renames it into place and only then removes the source. A crash never
+leaves a half-written file under the final name, nor loses the source.
+
+`TransferQueue` runs such copies on a small pool so several files stream at
+once while the caller keeps handling same-device renames in order.
+"""
+import errno
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from hashing import READ_BUFFER_SIZE, hash_file
+
+# Copies are disk bound: a few streams keep a drive busy, more just seek.
+DEFAULT_TRANSFER_WORKERS = 4
+COPY_CHUNK = 64 * 1024 * 1024
+PARTIAL_SUFFIX = ".partial"
+
+# (path, algorithm) -> hex digest or None, e.g. `Catalog.file_hash` (cached for unchanged files).
+SourceHash = Callable[[str, str], Optional[str]]
+
+# copy_file_range/sendfile refusing this pair of files: fall back to the next method.
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+
+
+class VerifyError(OSError):
+    """The copy's checksum doesn't match the source; the source is kept."""
+
+
+def _copy_fd(fsrc, fdst) -> None:
+    infd, outfd = fsrc.fileno(), fdst.fileno()
+    size = os.fstat(infd).st_size
+    offset = 0
+    # Some filesystems report success but copy nothing (n == 0 early): fall through then.
+    if hasattr(os, "copy_file_range"):
+        try:
+            while offset < size:
+                n = os.copy_file_range(infd, outfd, min(COPY_CHUNK, size - offset))
+                if n == 0:
+                    break
+                offset += n
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+    if hasattr(os, "sendfile") and offset < size:
+        try:
+            while offset < size:
+                n = os.sendfile(outfd, infd, offset, min(COPY_CHUNK, size - offset))
+                if n == 0:
+                    break
+                offset += n
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+    fsrc.seek(offset)
+    fdst.seek(offset)
+    buf = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buf)
+    while True:
+        n = fsrc.readinto(buf)
+        if not n:
+            return
+        done = 0
+        while done < n:
+            done += fdst.write(view[done:n])
+
+
+def copy_file(src, dst, verify: Optional[str] = None, source_hash: Optional[SourceHash] = None) -> None:
+    """Copy `src` to `dst` (data, then times/permissions), replacing `dst` atomically.
+
+    `verify` is a hash algorithm name; when set, the copy is hashed and
+    compared with the source before it gets its final name. The source's
+    digest comes from `source_hash` if given, so a cached one saves a read.
+    """
+    src, dst = os.fspath(src), os.fspath(dst)
+    tmp = dst + PARTIAL_SUFFIX
+    try:
+        with open(src, "rb", buffering=0) as fsrc, open(tmp, "wb", buffering=0) as fdst:
+            _copy_fd(fsrc, fdst)
+            # The source is deleted next: make sure the data is on disk first.
+            os.fsync(fdst.fileno())
+        shutil.copystat(src, tmp)
+        if verify:
+            expected, actual = (source_hash or hash_file)(src, verify), hash_file(tmp, verify)
+            if expected is None or expected != actual:
+                raise VerifyError(errno.EIO, f"Checksum mismatch after copy ({verify})", src)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def move_file(src, dst, verify: Optional[str] = None, source_hash: Optional[SourceHash] = None) -> None:
+    """`os.replace` when possible, otherwise `copy_file` + unlink of the source."""
+    try:
+        os.replace(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    if os.path.islink(src) or not os.path.isfile(src):
+        shutil.move(os.fspath(src), os.fspath(dst))
+        return
+    copy_file(src, dst, verify, source_hash)
+    os.unlink(src)
+
+
+class TransferQueue:
+    """Cross-device moves on a bounded pool; results come back in submission order.
+
+    `submit` only waits once 2 * workers moves are in flight. Every finished
+    move is returned exactly once, from `submit` or `drain`, as
+    (tag, None) on success or (tag, exception) on failure.
+    """
+
+    def __init__(self, workers: int = DEFAULT_TRANSFER_WORKERS, verify: Optional[str] = None,
+                 source_hash: Optional[SourceHash] = None):
+        self.workers = max(1, workers)
+        self.verify = verify
+        self.source_hash = source_hash
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending = deque()
+
+    def _move(self, src, dst) -> Optional[Exception]:
+        try:
+            move_file(src, dst, self.verify, self.source_hash)
+        except Exception as e:
+            return e
+        return None
+
+    def submit(self, src, dst, tag=None) -> List[Tuple[object, Optional[Exception]]]:
+        """Queue a move; returns results of older moves waited for while the queue was full."""
+        self._pending.append((tag, self._pool.submit(self._move, src, dst)))
+        finished = []
+        while len(self._pending) >= 2 * self.workers:
+            head, fut = self._pending.popleft()
+            finished.append((head, fut.result()))
+        return finished
+
+    def drain(self, cancel: bool = False) -> Iterator[Tuple[object, Optional[Exception]]]:
+        """Wait for queued moves and yield their results (`cancel` drops the ones not started)."""
+        while self._pending:
+            head, fut = self._pending.popleft()
+            if cancel and fut.cancel():
+                continue
+            yield head, fut.result()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
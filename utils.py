@@ -4,11 +4,16 @@ import datetime
 import hashlib
 from pathlib import Path
 from PIL import Image
-from PIL.ExifTags import TAGS
+
+from hashing import hash_file
+from metadata import UnsupportedFormat, capture_datetime
 
 IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.heic', '.tiff'}
 VIDEO_EXTS = {'.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv'}
 
+# Head/tail sample size used to pre-filter duplicate candidates.
+SAMPLE_SIZE = 64 * 1024
+
 try:
     from pillow_heif import register_heif_opener
     register_heif_opener()
@@ -17,19 +22,8 @@ except ImportError:
     HEIC_SUPPORT = False
 
 
-def resolve_conflict(target_path, mode, lang_manager=None):
-    """Handle file conflicts when target path already exists.
-
-    Supports stable mode codes:
-      - 'overwrite'
-      - 'skip'
-      - 'copy'
-
-    Backward compatible: also accepts localized UI texts (e.g. 'Üstüne Yaz', 'Overwrite').
-    """
-    if not target_path.exists():
-        return target_path, False
-
+def conflict_mode(mode, lang_manager=None):
+    """Normalize a conflict setting (mode code or localized UI text) to 'overwrite', 'skip' or 'copy'."""
     mode_code = None
     if isinstance(mode, str):
         m = mode.strip()
@@ -56,42 +50,142 @@ def resolve_conflict(target_path, mode, lang_manager=None):
         except Exception:
             pass
 
-    mode_code = mode_code or 'copy'
+    return mode_code or 'copy'
+
+def numbered_name(name, taken):
+    """First free `stem_N.ext` (N = 1, 2, ...) for `name` that is not in the `taken` name set."""
+    stem, ext = os.path.splitext(name)
+    n = 1
+    while True:
+        candidate = f"{stem}_{n}{ext}"
+        if os.path.normcase(candidate) not in taken:
+            return candidate
+        n += 1
+
+
+def _remove_existing(target_path):
+    try:
+        if target_path.is_dir():
+            shutil.rmtree(target_path)
+        else:
+            os.remove(target_path)
+        return True
+    except Exception:
+        return False
+
+
+def resolve_conflict(target_path, mode, lang_manager=None):
+    """Handle file conflicts when target path already exists.
+
+    Supports stable mode codes:
+      - 'overwrite'
+      - 'skip'
+      - 'copy'
+
+    Backward compatible: also accepts localized UI texts (e.g. 'Üstüne Yaz', 'Overwrite').
+    Checks the disk on every call; use `ConflictIndex` when writing many files.
+    """
+    if not target_path.exists():
+        return target_path, False
+
+    mode_code = conflict_mode(mode, lang_manager)
 
     if mode_code == 'overwrite':
-        try:
-            if target_path.is_dir():
-                shutil.rmtree(target_path)
-            else:
-                os.remove(target_path)
+        if _remove_existing(target_path):
             return target_path, False
-        except Exception:
-            return None, True
+        return None, True
 
     if mode_code == 'skip':
         return None, True
 
-    # copy: create a new name with a timestamp suffix
-    ts = datetime.datetime.now().strftime("%H%M%S")
-    new_name = f"{target_path.stem}_{ts}{target_path.suffix}"
-    return target_path.parent / new_name, False
+    # copy: first free numbered name (name_1.ext, name_2.ext, ...)
+    n = 1
+    while True:
+        candidate = target_path.with_name(f"{target_path.stem}_{n}{target_path.suffix}")
+        if not candidate.exists():
+            return candidate, False
+        n += 1
+
+
+class ConflictIndex:
+    """`resolve_conflict` for bulk writes, without a disk check per file.
+
+    Each target directory is listed once; names are then resolved against the
+    in-memory set, which is updated as names are handed out, so files written
+    in the same run (even in the same second) never collide.
+    """
+
+    def __init__(self, mode, lang_manager=None):
+        self.mode_code = conflict_mode(mode, lang_manager)
+        self._names = {}
+
+    def names_in(self, directory):
+        """Set of (normcase'd) names in `directory`, listed on first use."""
+        key = os.fspath(directory)
+        names = self._names.get(key)
+        if names is None:
+            try:
+                names = {os.path.normcase(n) for n in os.listdir(key)}
+            except OSError:
+                names = set()
+            self._names[key] = names
+        return names
+
+    def resolve(self, target_path):
+        """Same contract as `resolve_conflict`: (final path or None, skipped).
+
+        In overwrite mode the existing file is left alone: the writer replaces
+        it, so nothing is lost if the replacement is never written.
+        """
+        target_path = Path(target_path)
+        taken = self.names_in(target_path.parent)
+        key = os.path.normcase(target_path.name)
+        if key not in taken:
+            taken.add(key)
+            return target_path, False
+
+        if self.mode_code == 'overwrite':
+            return target_path, False
+
+        if self.mode_code == 'skip':
+            return None, True
+
+        new_name = numbered_name(target_path.name, taken)
+        taken.add(os.path.normcase(new_name))
+        return target_path.parent / new_name, False
+
+    def moved(self, src, dst=None):
+        """Record that `src` left its folder (and, optionally, that `dst` now exists)."""
+        src = Path(src)
+        names = self._names.get(os.fspath(src.parent))
+        if names is not None:
+            names.discard(os.path.normcase(src.name))
+        if dst is not None:
+            dst = Path(dst)
+            self.names_in(dst.parent).add(os.path.normcase(dst.name))
 
 
 def get_date_from_file(file_path):
     """Extract date information from file EXIF or modification time."""
+    file_path = Path(file_path)
     str_date = None
     if file_path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.tiff', '.heic']:
         try:
-            img = Image.open(file_path)
-            exif = img._getexif()
-            if exif:
-                for tag, val in exif.items():
-                    if TAGS.get(tag) == 'DateTimeOriginal':
-                        str_date = val.split(' ')[0].replace(':', '-')
-                        break
-        except:
+            # Header-only parse; PIL is only needed for formats it can't read (HEIC).
+            dt = capture_datetime(file_path)
+            if dt is not None:
+                str_date = dt.strftime('%Y-%m-%d')
+        except UnsupportedFormat:
+            str_date = _pil_exif_date(file_path)
+    elif file_path.suffix.lower() in ['.mp4', '.mov']:
+        try:
+            # Container creation date (moov/mvhd, QuickTime keys); copies keep it, unlike mtime.
+            dt = capture_datetime(file_path)
+            if dt is not None:
+                str_date = dt.strftime('%Y-%m-%d')
+        except UnsupportedFormat:
             pass
-    
+
     if not str_date:
         try:
             ts = os.path.getmtime(file_path)
@@ -100,13 +194,39 @@ def get_date_from_file(file_path):
             pass
     return str_date
 
+def _pil_exif_date(file_path):
+    try:
+        with Image.open(file_path) as img:
+            val = img.getexif().get_ifd(0x8769).get(0x9003)
+            if val:
+                return val.split(' ')[0].replace(':', '-')
+    except:
+        pass
+    return None
+
 def get_hash(file_path):
     """Calculate MD5 hash of file."""
-    h = hashlib.md5()
+    try:
+        return hash_file(file_path, 'md5')
+    except:
+        return None
+
+def get_sample_hash(file_path, size=None, block=SAMPLE_SIZE):
+    """Fingerprint the first and last `block` bytes of a file.
+
+    Cheap pre-filter for duplicate detection: files that differ here can't be
+    identical. When the file is at most 2 * block bytes the two samples cover
+    it entirely, so equal fingerprints (for equal sizes) mean equal content.
+    """
+    h = hashlib.blake2b(digest_size=16)
     try:
         with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
-                h.update(chunk)
+            if size is None:
+                size = os.fstat(f.fileno()).st_size
+            h.update(f.read(block))
+            if size > block:
+                f.seek(max(block, size - block))
+                h.update(f.read(block))
         return h.hexdigest()
     except:
         return None
@@ -0,0 +1,329 @@
+"""Live dashboard updates for the loaded folder.
+
+After the first full scan, the folder is kept current by re-listing only the
+directories that changed instead of rescanning the whole tree:
+
+- `FolderIndex` holds a per-directory snapshot plus the dashboard counters and
+  turns "this directory changed" into added/removed file deltas.
+- `LiveFolderWatcher` feeds it (on a background thread) from `QFileSystemWatcher` (inotify on Linux)
+  and falls back to polling directory mtimes for directories the OS refuses
+  to watch (watch limits, network shares).
+- Editing a file in place changes neither its directory's mtime nor fires a
+  directory notification, so the tree is also re-listed round-robin, a batch
+  of directories per poll tick; re-listing compares each file's size/mtime.
+"""
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, Qt, QThread, QTimer, Signal, Slot
+
+from catalog import file_kind, open_catalog
+from scanner import iter_files, list_dir
+
+# Coalesce bursts of events (e.g. the organizer moving thousands of files).
+DEBOUNCE_MS = 300
+POLL_INTERVAL_MS = 3000
+# Directories stat'ed per poll tick; large trees are polled round-robin.
+POLL_BATCH = 2000
+# Keep OS watch handles bounded; the rest of the tree is polled.
+MAX_WATCHED_DIRS = 4096
+# Directories re-listed per poll tick to pick up in-place file edits.
+EDIT_SCAN_BATCH = 200
+
+
+class Delta(NamedTuple):
+    added: List
+    removed: List
+    new_dirs: List[str]
+    gone_dirs: List[str]
+
+
+class FolderIndex:
+    """In-memory snapshot of a folder tree with running dashboard counters."""
+
+    _STAT_KEY = {"image": "images", "video": "videos", "other": "others"}
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        self._files: Dict[str, Dict[str, object]] = {}
+        self._children: Dict[str, Set[str]] = {}
+        self.counts = {"images": 0, "videos": 0, "others": 0, "size": 0}
+
+    @property
+    def dirs(self) -> List[str]:
+        return list(self._files)
+
+    def load(self, entries: Iterable, dirs: Iterable[str]) -> None:
+        for d in dirs:
+            self._add_dir(d)
+        for e in entries:
+            self._add_dir(os.path.dirname(e.path))
+            self._files[os.path.dirname(e.path)][e.name] = e
+            self._count(e, 1)
+
+    def stats(self) -> Dict:
+        stats = dict(self.counts)
+        stats["size_mb"] = round(stats["size"] / (1024 * 1024), 2)
+        return stats
+
+    def _count(self, entry, sign: int) -> None:
+        self.counts[self._STAT_KEY[file_kind(entry.ext)]] += sign
+        self.counts["size"] += sign * entry.size
+
+    def _add_dir(self, d: str) -> None:
+        if d in self._files:
+            return
+        self._files[d] = {}
+        if d != self.root:
+            self._children.setdefault(os.path.dirname(d), set()).add(d)
+
+    def _drop_dir(self, d: str, removed: List, gone: List[str]) -> None:
+        for child in self._children.pop(d, ()):
+            self._drop_dir(child, removed, gone)
+        for e in self._files.pop(d, {}).values():
+            self._count(e, -1)
+            removed.append(e)
+        parent = self._children.get(os.path.dirname(d))
+        if parent is not None:
+            parent.discard(d)
+        gone.append(d)
+
+    def rescan_dir(self, d: str) -> Delta:
+        """Re-list directory `d` and apply the differences to the snapshot."""
+        added: List = []
+        removed: List = []
+        new_dirs: List[str] = []
+        gone_dirs: List[str] = []
+
+        if not os.path.isdir(d):
+            if d in self._files:
+                self._drop_dir(d, removed, gone_dirs)
+            return Delta(added, removed, new_dirs, gone_dirs)
+
+        self._add_dir(d)
+        files, subdirs = list_dir(d)
+        old = self._files[d]
+        new = {e.name: e for e in files}
+        for name, e in old.items():
+            cur = new.get(name)
+            if cur is None or (cur.size, cur.mtime_ns, cur.ino) != (e.size, e.mtime_ns, e.ino):
+                self._count(e, -1)
+                removed.append(e)
+        for name, e in new.items():
+            prev = old.get(name)
+            if prev is None or (prev.size, prev.mtime_ns, prev.ino) != (e.size, e.mtime_ns, e.ino):
+                self._count(e, 1)
+                added.append(e)
+        self._files[d] = new
+
+        known = self._children.get(d, set())
+        for gone in known - set(subdirs):
+            self._drop_dir(gone, removed, gone_dirs)
+        for sub in subdirs:
+            if sub in known:
+                continue
+            # A whole new subtree (mkdir, or a folder moved in): walk it once.
+            listed: List[str] = []
+            sub_entries = list(iter_files(sub, on_dir=listed.append))
+            self.load(sub_entries, listed)
+            added.extend(sub_entries)
+            new_dirs.extend(listed)
+        return Delta(added, removed, new_dirs, gone_dirs)
+
+
+def apply_delta_to_catalog(catalog, delta: Delta) -> None:
+    """Mirror a `Delta` into the catalog, keeping cached metadata across moves."""
+    moved_from = {(e.dev, e.ino): e for e in delta.removed if e.ino}
+    for e in delta.added:
+        old = moved_from.pop((e.dev, e.ino), None) if e.ino else None
+        if old is not None and old.path != e.path:
+            catalog.move(old.path, e.path)
+        catalog.upsert(e)
+    for e in moved_from.values():
+        catalog.remove(e.path)
+    for e in delta.removed:
+        if not e.ino:
+            catalog.remove(e.path)
+    catalog.commit()
+
+
+class _WatchWorker(QObject):
+    """Does the watching, re-listing and catalog writes; lives on its own thread."""
+
+    # (root, stats)
+    stats_changed = Signal(str, dict)
+
+    def __init__(self):
+        super().__init__()
+        self.index: Optional[FolderIndex] = None
+        self._catalog = None
+        self._dirty: Set[str] = set()
+        self._polled: Dict[str, int] = {}
+        self._poll_cursor = 0
+        self._edit_cursor = 0
+
+        self._fs = QFileSystemWatcher(self)
+        self._fs.directoryChanged.connect(self._queue)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.flush)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(POLL_INTERVAL_MS)
+        self._poll_timer.timeout.connect(self._poll_tick)
+
+    @Slot(str, object, object)
+    def start(self, root, entries, dirs) -> None:
+        """Begin live updates from the result of a full scan of `root`."""
+        self.stop()
+        self.index = FolderIndex(root)
+        self.index.load(entries, dirs)
+        self._catalog = open_catalog()
+        self._watch(self.index.dirs)
+        self._poll_timer.start()
+
+    @Slot()
+    def stop(self) -> None:
+        self._debounce.stop()
+        self._poll_timer.stop()
+        watched = self._fs.directories()
+        if watched:
+            self._fs.removePaths(watched)
+        self._polled.clear()
+        self._dirty.clear()
+        self.index = None
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+
+    def _watch(self, dirs: List[str]) -> None:
+        if not dirs:
+            return
+        room = max(0, MAX_WATCHED_DIRS - len(self._fs.directories()))
+        failed = self._fs.addPaths(dirs[:room]) if room else []
+        for d in list(failed) + dirs[room:]:
+            try:
+                self._polled[d] = os.stat(d).st_mtime_ns
+            except OSError:
+                pass
+
+    def _unwatch(self, dirs: List[str]) -> None:
+        watched = set(self._fs.directories())
+        drop = [d for d in dirs if d in watched]
+        if drop:
+            self._fs.removePaths(drop)
+        for d in dirs:
+            self._polled.pop(d, None)
+
+    def _queue(self, path: str) -> None:
+        self._dirty.add(path)
+        self._debounce.start()
+
+    def _poll_tick(self) -> None:
+        if self.index is None:
+            self._poll_timer.stop()
+            return
+        dirs = list(self._polled)
+        if self._poll_cursor >= len(dirs):
+            self._poll_cursor = 0
+        batch = dirs[self._poll_cursor:self._poll_cursor + POLL_BATCH]
+        self._poll_cursor += POLL_BATCH
+        for d in batch:
+            try:
+                mtime = os.stat(d).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime != self._polled.get(d):
+                self._polled[d] = mtime
+                self._queue(d)
+
+        # In-place edits: re-list the next slice of the tree (file size/mtime compared).
+        all_dirs = self.index.dirs
+        if self._edit_cursor >= len(all_dirs):
+            self._edit_cursor = 0
+        self._dirty.update(all_dirs[self._edit_cursor:self._edit_cursor + EDIT_SCAN_BATCH])
+        self._edit_cursor += EDIT_SCAN_BATCH
+        self.flush()
+
+    @Slot()
+    def flush(self) -> None:
+        """Apply all pending directory changes now."""
+        self._debounce.stop()
+        if self.index is None or not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        changed = False
+        # Parents first, so a removed subtree isn't re-listed piecemeal.
+        for d in sorted(dirty, key=len):
+            delta = self.index.rescan_dir(d)
+            if not (delta.added or delta.removed or delta.new_dirs or delta.gone_dirs):
+                continue
+            changed = True
+            self._unwatch(delta.gone_dirs)
+            self._watch(delta.new_dirs)
+            if self._catalog is not None:
+                try:
+                    apply_delta_to_catalog(self._catalog, delta)
+                except Exception:
+                    pass
+        if changed:
+            self.stats_changed.emit(self.index.root, self.index.stats())
+
+
+class LiveFolderWatcher(QObject):
+    """Keeps dashboard stats (and the catalog) current for one folder.
+
+    GUI-side handle: all disk and catalog work happens in a `_WatchWorker` on
+    a background thread; only the resulting stats come back, via a signal.
+    """
+
+    stats_changed = Signal(dict)
+    _start_requested = Signal(str, object, object)
+    _stop_requested = Signal()
+    _flush_requested = Signal()
+    _shutdown_requested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root: Optional[str] = None
+        self._thread = QThread(self)
+        self._worker = _WatchWorker()
+        self._worker.moveToThread(self._thread)
+        self._start_requested.connect(self._worker.start)
+        self._stop_requested.connect(self._worker.stop)
+        self._flush_requested.connect(self._worker.flush)
+        self._shutdown_requested.connect(self._worker.stop, Qt.BlockingQueuedConnection)
+        self._worker.stats_changed.connect(self._on_stats)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+    def is_watching(self, root) -> bool:
+        return self._root is not None and self._root == os.fspath(root)
+
+    def start(self, root, entries, dirs) -> None:
+        """Begin live updates from the result of a full scan of `root`."""
+        self._root = os.fspath(root)
+        self._start_requested.emit(self._root, entries, dirs)
+
+    def stop(self) -> None:
+        self._root = None
+        self._stop_requested.emit()
+
+    def flush(self) -> None:
+        """Apply pending directory changes as soon as possible."""
+        self._flush_requested.emit()
+
+    def shutdown(self) -> None:
+        """Stop watching and end the background thread (waits for it)."""
+        self._root = None
+        if self._thread.isRunning():
+            self._shutdown_requested.emit()
+            self._thread.quit()
+            self._thread.wait()
+
+    def _on_stats(self, root: str, stats: dict) -> None:
+        # Drop updates still queued from a folder that is no longer shown.
+        if root == self._root:
+            self.stats_changed.emit(stats)
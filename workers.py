@@ -1,7 +1,7 @@
 import os
-import shutil
-import datetime
-import glob
+import random
+import threading
+import time
 
 # Optional deps (keep the app usable even without the repair stack)
 try:
@@ -29,10 +29,62 @@ from PIL import Image, UnidentifiedImageError
 from PySide6.QtCore import QThread, Signal
 
 from utils import IMAGE_EXTS, VIDEO_EXTS
-from utils import resolve_conflict, get_date_from_file, get_hash
+from utils import ConflictIndex, conflict_mode, get_date_from_file, get_hash
+from scanner import WalkProgress, estimate_dir_count, iter_files, list_files
+from catalog import open_catalog
+from dedup import find_duplicate_groups, match_reference, replace_with_hardlink, replace_with_reflink, same_content
+from hashing import DEFAULT_HASH_WORKERS, HashEngine, fastest_backend, hash_file
+from organizer import PlannedMove, build_plan, execute_plan, folder_name
+from ignore import CONVERT_FOLDER, PRIVACY_FOLDER, load_rules
+from transfer import move_file
+from converter import BENCHMARK_SAMPLE, DEFAULT_CONVERT_WORKERS, DEFAULT_PROFILE, MANIFEST_NAME, ConversionManifest, ConversionPool, ConvertTask, benchmark_profiles
+from journal import JournalWriter, load_journal
+from dupreport import build_report, load_report, report_pairs, save_report, unchanged
+from perceptual import DEFAULT_THRESHOLD, VIDEO_ALGORITHM, find_similar_groups, find_similar_videos, hash_algorithm as perceptual_algorithm
+
+
+def cached_date(catalog, entry):
+    """`get_date_from_file` for a scanner entry, memoized in the catalog."""
+    if catalog is not None:
+        row = catalog.lookup(entry)
+        if row is not None and row.exif_date:
+            return row.exif_date
+    date_str = get_date_from_file(Path(entry.path))
+    if catalog is not None and date_str:
+        catalog.upsert(entry, exif_date=date_str)
+    return date_str
+
+
+def known_hash(catalog, entry, algorithm='md5'):
+    """Cached content hash of an unchanged file (same dev/inode/size/mtime)."""
+    if catalog is None:
+        return None
+    return catalog.get_hash(entry, algorithm)
+
+
+def cached_hash(catalog, entry, engine=None):
+    """Content hash for a scanner entry, memoized in the catalog's hash cache."""
+    algorithm = engine.algorithm if engine is not None else 'md5'
+    f_hash = known_hash(catalog, entry, algorithm)
+    if f_hash:
+        return f_hash
+    f_hash = engine.hash_file(entry.path) if engine is not None else get_hash(entry.path)
+    if f_hash and catalog is not None:
+        catalog.put_hash(entry, f_hash, algorithm)
+    return f_hash
+
+
+# Analyzer partial results: at most every PARTIAL_INTERVAL seconds or PARTIAL_EVERY files.
+PARTIAL_INTERVAL = 0.25
+PARTIAL_EVERY = 5000
+
 
 class AnalyzerWorker(QThread):
     finished_signal = Signal(dict)
+    # Running totals while the walk is in progress (+ 'files' and 'eta' seconds or None).
+    partial_signal = Signal(dict)
+    # (folder, entries, dirs) of the completed walk, used to start live updates.
+    snapshot_signal = Signal(str, object, object)
     
     def __init__(self, folder):
         super().__init__()
@@ -40,94 +92,234 @@ class AnalyzerWorker(QThread):
 
     def run(self):
         stats = {"images": 0, "videos": 0, "others": 0, "size": 0}
+        entries = []
+        dirs = []
+        progress = WalkProgress()
+
+        # Sample the tree's fan-out next to the walk to estimate its total size.
+        estimate = {}
+        sampler = threading.Thread(target=lambda: estimate.setdefault("dirs", estimate_dir_count(self.folder)), daemon=True)
+        sampler.start()
+        started = last_emit = time.monotonic()
+        last_count = 0
         
         try:
-            for file in self.folder.rglob("*.*"):
-                if self.isInterruptionRequested():
-                    return 
-
-                if file.is_file():
-                    ext = file.suffix.lower()
-                    try: 
-                        stats["size"] += file.stat().st_size
-                    except PermissionError:
-                        pass 
-                    except: 
-                        pass
-                    
-                    if ext in IMAGE_EXTS: stats["images"] += 1
-                    elif ext in VIDEO_EXTS: stats["videos"] += 1
-                    else: stats["others"] += 1
+            for entry in iter_files(self.folder, should_stop=self.isInterruptionRequested, on_dir=dirs.append, progress=progress):
+                entries.append(entry)
+                stats["size"] += entry.size
+                if entry.ext in IMAGE_EXTS: stats["images"] += 1
+                elif entry.ext in VIDEO_EXTS: stats["videos"] += 1
+                else: stats["others"] += 1
+
+                n = len(entries)
+                if n - last_count >= PARTIAL_EVERY or (n & 0xFF == 0 and time.monotonic() - last_emit >= PARTIAL_INTERVAL):
+                    last_emit, last_count = time.monotonic(), n
+                    partial = dict(stats)
+                    partial["size_mb"] = round(stats["size"] / (1024 * 1024), 2)
+                    partial["files"] = n
+                    partial["eta"] = progress.eta(last_emit - started, estimate.get("dirs"))
+                    self.partial_signal.emit(partial)
         except Exception: pass
         
         if not self.isInterruptionRequested():
             stats["size_mb"] = round(stats["size"] / (1024 * 1024), 2)
             self.finished_signal.emit(stats)
+            self.snapshot_signal.emit(str(self.folder), entries, dirs)
+
+            # Keep the catalog in step so later operations can reuse cached metadata.
+            catalog = open_catalog()
+            if catalog is not None:
+                try:
+                    catalog.sync(self.folder, entries)
+                except Exception:
+                    pass
+                finally:
+                    catalog.close()
 
 class OrganizerWorker(QThread):
     log_signal = Signal(str)
     progress_signal = Signal(int)
     finished_signal = Signal()
     
-    def __init__(self, folder, mode, conflict, lang_manager=None):
+    def __init__(self, folder, mode, conflict, lang_manager=None, dry_run=False, resume=False, undo=False, verify=False):
         super().__init__()
         self.folder = Path(folder)
         self.mode = mode
         self.conflict = conflict
         self.lang_manager = lang_manager
+        # Checksum files copied across devices before their source is deleted
+        self.verify = verify
+        # Only log the move plan, don't move anything
+        self.dry_run = dry_run
+        # Continue / roll back the last journaled run on this folder instead of planning a new one
+        self.resume = resume
+        self.undo = undo
+        self.catalog = None
 
     def run(self):
-        files = list(self.folder.rglob("*.*"))
-        total = len(files)
+        self.catalog = open_catalog()
+        try:
+            if self.undo:
+                self._undo()
+            elif self.resume:
+                self._resume()
+            else:
+                self._organize()
+        finally:
+            if self.catalog is not None:
+                self.catalog.close()
+
+    def _organize(self):
+        # Skip output folders, ignore-file rules and folders this mode already produced.
+        prune = load_rules(self.folder, date_folder=folder_name('2000-01-01', self.mode))
+        entries = list_files(self.folder, should_stop=self.isInterruptionRequested, prune=prune)
+        total = len(entries)
         if total == 0: self.finished_signal.emit(); return
         
         msg = self.lang_manager.get('start_organizing') if self.lang_manager else "🚀 Organizing Started..."
         self.log_signal.emit(msg)
-        
-        for i, file in enumerate(files):
 
-            if self.isInterruptionRequested(): 
-                msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
+        # Phase 1: dates (in parallel) and conflicts (in memory) -> complete move plan.
+        plan = build_plan(
+            self.folder, entries,
+            date_of=lambda e: cached_date(self.catalog, e),
+            mode=self.mode,
+            conflict=conflict_mode(self.conflict, self.lang_manager),
+            should_stop=self.isInterruptionRequested,
+            on_progress=lambda p: self.progress_signal.emit(int(p * 50)),
+        )
+        if self.isInterruptionRequested():
+            self._stop()
+            return
+        self.progress_signal.emit(50)
+
+        moves = sum(1 for m in plan if m.action != 'skip')
+        plan_msg = self.lang_manager.get('organize_plan').format(total, moves, len(plan) - moves) if self.lang_manager else f"📝 Plan: {total} files, {moves} to move, {len(plan) - moves} skipped"
+        self.log_signal.emit(plan_msg)
+
+        if self.dry_run:
+            for move in plan:
+                rel = os.path.relpath(move.dst, self.folder)
+                if move.action == 'skip':
+                    msg = self.lang_manager.get('skipped').format(os.path.basename(move.src)) if self.lang_manager else f"⏩ Skipped: {os.path.basename(move.src)}"
+                else:
+                    msg = self.lang_manager.get('plan_move').format(os.path.basename(move.src), rel) if self.lang_manager else f"📝 {os.path.basename(move.src)} → {rel}"
                 self.log_signal.emit(msg)
-                self.finished_signal.emit()
-                return 
-            
-            if not file.is_file(): continue
-            
-            date_str = get_date_from_file(file)
-            if date_str:
+            self.progress_signal.emit(100)
+            self.finished_signal.emit()
+            return
+
+        for move in plan:
+            if move.action == 'skip':
+                msg = self.lang_manager.get('skipped').format(os.path.basename(move.src)) if self.lang_manager else f"⏩ Skipped: {os.path.basename(move.src)}"
+                self.log_signal.emit(msg)
+
+        # Phase 2: one mkdir per folder, then plain renames, journaled for resume/undo.
+        journal = JournalWriter.start(self.folder, plan)
+        self._execute(journal, [(i, m) for i, m in enumerate(plan) if m.action != 'skip'], 'done', 50)
+
+    def _execute(self, journal, steps, op, base):
+        """Run (plan index, move) steps, recording each as `op` in the journal."""
+        def moved(n, move):
+            journal.record(op, steps[n][0])
+            self._on_moved(move)
+
+        try:
+            finished = execute_plan(
+                [move for _, move in steps],
+                on_moved=moved,
+                on_error=lambda n, move, error: self._on_move_error(move, error),
+                should_stop=self.isInterruptionRequested,
+                on_progress=lambda p: self.progress_signal.emit(base + int(p * (100 - base))),
+                verify=fastest_backend() if self.verify else None,
+                source_hash=self.catalog.file_hash if self.catalog is not None else None,
+            )
+            if finished:
+                journal.complete(undo=op == 'undone')
+        finally:
+            journal.close()
+        if not finished:
+            self._stop()
+            return False
+        self.progress_signal.emit(100)
+        self.finished_signal.emit()
+        return True
+
+    def _resume(self):
+        """Finish the moves of an interrupted run from its journal."""
+        state = load_journal(self.folder)
+        if state is None or state.complete:
+            msg = self.lang_manager.get('nothing_to_resume') if self.lang_manager else "ℹ️ No interrupted run to resume."
+            self.log_signal.emit(msg)
+            self.finished_signal.emit()
+            return
+        steps = []
+        for i in state.pending():
+            move = state.plan[i]
+            if move.action == 'move' and os.path.lexists(move.dst):
+                # Something else took the name meanwhile: don't overwrite it.
+                name = os.path.basename(move.src)
+                msg = self.lang_manager.get('skipped').format(name) if self.lang_manager else f"⏩ Skipped: {name}"
+                self.log_signal.emit(msg)
+                continue
+            steps.append((i, move))
+        msg = self.lang_manager.get('resuming').format(len(state.done), len(steps)) if self.lang_manager else f"⏯️ Resuming: {len(state.done)} already moved, {len(steps)} left"
+        self.log_signal.emit(msg)
+        self._execute(JournalWriter.reopen(self.folder), steps, 'done', 0)
+
+    def _undo(self):
+        """Move files of the last journaled run back, newest first."""
+        state = load_journal(self.folder)
+        order = state.to_undo() if state is not None else []
+        if not order:
+            msg = self.lang_manager.get('nothing_to_undo') if self.lang_manager else "ℹ️ Nothing to undo."
+            self.log_signal.emit(msg)
+            self.finished_signal.emit()
+            return
+        msg = self.lang_manager.get('undoing').format(len(order)) if self.lang_manager else f"↩️ Undoing {len(order)} moves..."
+        self.log_signal.emit(msg)
+        steps = []
+        for i in order:
+            move = state.plan[i]
+            if os.path.lexists(move.src):
+                name = os.path.basename(move.src)
+                msg = self.lang_manager.get('skipped').format(name) if self.lang_manager else f"⏩ Skipped: {name}"
+                self.log_signal.emit(msg)
+                continue
+            if state.irreversible(i):
+                # The file this move replaced is gone; only the move itself comes back.
+                name = os.path.basename(move.dst)
+                msg = self.lang_manager.get('undo_overwritten').format(name) if self.lang_manager else f"⚠️ {name}: the file it replaced can't be restored"
+                self.log_signal.emit(msg)
+            steps.append((i, PlannedMove(move.dst, move.src, 'move')))
+        if self._execute(JournalWriter.reopen(self.folder), steps, 'undone', 0):
+            # Drop date folders the run created and that are empty again.
+            for d in sorted({os.path.dirname(m.src) for _, m in steps}, key=len, reverse=True):
                 try:
-                    dt = datetime.datetime.strptime(date_str, '%Y-%m-%d')
-                    folder_name = date_str
-                    if self.mode in ('by_year', 'year') or (isinstance(self.mode, str) and ('Year' in self.mode or 'Yıla' in self.mode)): 
-                        folder_name = dt.strftime('%Y')
-                    elif self.mode in ('by_month', 'month') or (isinstance(self.mode, str) and ('Month' in self.mode or 'Aya' in self.mode)): 
-                        folder_name = dt.strftime('%Y-%m')
-                    
-                    target_dir = self.folder / folder_name
-                    target_dir.mkdir(exist_ok=True)
-                    
-                    final_path, skip = resolve_conflict(target_dir / file.name, self.conflict, self.lang_manager)
-                    
-                    if not skip and final_path != file:
-                        shutil.move(str(file), str(final_path))
-                        msg = self.lang_manager.get('moved').format(file.name) if self.lang_manager else f"✅ Moved: {file.name}"
-                        self.log_signal.emit(msg)
-                    elif skip:
-                        msg = self.lang_manager.get('skipped').format(file.name) if self.lang_manager else f"⏩ Skipped: {file.name}"
-                        self.log_signal.emit(msg)
-                
-                except PermissionError:
-                    msg = self.lang_manager.get('access_denied').format(file.name) if self.lang_manager else f"❌ Access Denied: {file.name}"
-                    self.log_signal.emit(msg)
-                except OSError as e:
-                    msg = self.lang_manager.get('disk_error').format(file.name, e) if self.lang_manager else f"❌ Disk/File Error: {file.name} ({e})"
-                    self.log_signal.emit(msg)
-                except Exception as e: 
-                    msg = self.lang_manager.get('unexpected_error_file').format(file.name, e) if self.lang_manager else f"❌ Unexpected Error: {file.name} ({e})"
-                    self.log_signal.emit(msg)
-                    
-            self.progress_signal.emit(int((i + 1) / total * 100))
+                    os.rmdir(d)
+                except OSError:
+                    pass
+
+    def _on_moved(self, move):
+        if self.catalog is not None:
+            self.catalog.move(move.src, move.dst)
+        name = os.path.basename(move.src)
+        msg = self.lang_manager.get('moved').format(name) if self.lang_manager else f"✅ Moved: {name}"
+        self.log_signal.emit(msg)
+
+    def _on_move_error(self, move, error):
+        name = os.path.basename(move.src)
+        if isinstance(error, PermissionError):
+            msg = self.lang_manager.get('access_denied').format(name) if self.lang_manager else f"❌ Access Denied: {name}"
+        elif isinstance(error, OSError):
+            msg = self.lang_manager.get('disk_error').format(name, error) if self.lang_manager else f"❌ Disk/File Error: {name} ({error})"
+        else:
+            msg = self.lang_manager.get('unexpected_error_file').format(name, error) if self.lang_manager else f"❌ Unexpected Error: {name} ({error})"
+        self.log_signal.emit(msg)
+
+    def _stop(self):
+        msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
+        self.log_signal.emit(msg)
         self.finished_signal.emit()
 
 
@@ -136,112 +328,416 @@ class CleanerWorker(QThread):
     progress_signal = Signal(int)
     finished_signal = Signal()
 
-    def __init__(self, folder, conflict, lang_manager=None):
+    def __init__(self, folder, conflict, lang_manager=None, hash_workers=DEFAULT_HASH_WORKERS, hash_algorithm='md5', action='move', similar=False, similar_threshold=DEFAULT_THRESHOLD, report_path=None, apply_report=None, reference_roots=None):
         super().__init__()
         self.folder = Path(folder)
         self.conflict = conflict
+        # 'move' (to the duplicates folder), 'hardlink' or 'reflink'
+        self.action = action
+        # Also look for near-duplicate images (perceptual hash within `similar_threshold` bits)
+        self.similar = similar
+        self.similar_threshold = similar_threshold
+        # Dry run: write the findings to this JSON/CSV file instead of acting on them
+        self.report_path = report_path
+        # Act on a previously saved report instead of scanning
+        self.apply_report = apply_report
+        # Match the folder against these indexed libraries (see ReferenceIndexWorker) instead of itself
+        self.reference_roots = list(reference_roots or [])
         self.lang_manager = lang_manager
+        self.hash_workers = hash_workers
+        self.hash_algorithm = hash_algorithm
+        self.catalog = None
+
+    def _on_scan_error(self, path, error):
+        if isinstance(error, PermissionError):
+            name = os.path.basename(path)
+            read_msg = self.lang_manager.get('read_error').format(name) if self.lang_manager else f"❌ Read Permission Denied: {name}"
+            self.log_signal.emit(read_msg)
 
     def run(self):
-        files = [f for f in self.folder.rglob("*.*") if f.is_file()]
-        total = len(files) or 1
+        self.catalog = open_catalog()
+        try:
+            if self.apply_report:
+                self._apply_report()
+            elif self.reference_roots:
+                self._match_reference()
+            else:
+                self._clean()
+        finally:
+            if self.catalog is not None:
+                try:
+                    self.catalog.evict_hashes()
+                except Exception:
+                    pass
+                self.catalog.close()
+
+    def _clean(self):
+        files = list_files(self.folder, should_stop=self.isInterruptionRequested, on_error=self._on_scan_error, prune=load_rules(self.folder))
+
+        msg = self.lang_manager.get('scan_start') if self.lang_manager else "🔍 Duplicate scan started..."
+        self.log_signal.emit(msg)
+
+        if self.isInterruptionRequested():
+            self._stop()
+            return
+        self.progress_signal.emit(10)
+
+        # size -> head/tail sample -> full hash; each stage only sees what the last couldn't rule out.
+        engine = HashEngine(workers=self.hash_workers, algorithm=self.hash_algorithm)
+        groups, report = find_duplicate_groups(
+            files,
+            full_hash=lambda e: cached_hash(self.catalog, e, engine),
+            engine=engine,
+            cached_hash=lambda e: known_hash(self.catalog, e, engine.algorithm),
+            should_stop=self.isInterruptionRequested,
+            on_progress=lambda p: self.progress_signal.emit(10 + int(p * (40 if self.similar else 65))),
+        )
+        if self.isInterruptionRequested():
+            self._stop()
+            return
+
+        duplicates = []
+        for grp in groups:
+            keep = Path(grp[0].path)
+            for entry in grp[1:]:
+                f = Path(entry.path)
+                duplicates.append((keep, f, entry.size))
+                dup_msg = self.lang_manager.get('duplicate_found').format(f.name) if self.lang_manager else f"⚠️ Duplicate Found: {f.name}"
+                self.log_signal.emit(dup_msg)
+
+        mb = 1024 * 1024
+        stage_msg = self.lang_manager.get('dedup_stages').format(report.files, report.size_candidates, report.sample_candidates, report.compared_candidates, report.full_candidates, report.duplicates) if self.lang_manager else f"📊 {report.files} files → {report.size_candidates} same size → {report.sample_candidates} same head/tail → {report.compared_candidates} compared side by side + {report.full_candidates} full hashed → {report.duplicates} duplicates"
+        self.log_signal.emit(stage_msg)
+        bytes_msg = self.lang_manager.get('dedup_bytes').format(round(report.sample_bytes / mb, 1), round(report.compared_bytes / mb, 1), round(report.full_bytes / mb, 1), round(report.skipped_bytes / mb, 1)) if self.lang_manager else f"📊 Read {round(report.sample_bytes / mb, 1)} MB of samples + {round(report.compared_bytes / mb, 1)} MB compared + {round(report.full_bytes / mb, 1)} MB full hashes, skipped {round(report.skipped_bytes / mb, 1)} MB"
+        self.log_signal.emit(bytes_msg)
+        if report.hardlinks:
+            link_msg = self.lang_manager.get('hardlinks_skipped').format(report.hardlinks) if self.lang_manager else f"🔗 {report.hardlinks} already hardlinked files skipped"
+            self.log_signal.emit(link_msg)
+
+        similar_groups = []
+        if self.similar:
+            similar_groups = self._find_similar(files, engine, {id(e) for grp in groups for e in grp[1:]})
+            if similar_groups is None:
+                self._stop()
+                return
+
+        if self.report_path:
+            self._save_report(build_report(self.folder, groups, similar_groups))
+            self.progress_signal.emit(100)
+            self.finished_signal.emit()
+            return
+
+        similar = [(Path(grp[0].path), Path(e.path), e.size) for grp in similar_groups for e in grp[1:]]
+        if self._resolve(duplicates, similar):
+            return
+        self.progress_signal.emit(100)
+        self.finished_signal.emit()
+
+    def _reference_hash(self, row, algorithm):
+        """Indexed digest of a library file, or None if it changed since indexing."""
+        try:
+            st = os.stat(row.path)
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) != (row.size, row.mtime_ns):
+            return None
+        digest = known_hash(self.catalog, row, algorithm)
+        if digest is None:
+            # Indexed without this algorithm: hash it once, later imports reuse it.
+            digest = hash_file(row.path, algorithm)
+            if digest:
+                self.catalog.put_hash(row, digest, algorithm)
+        return digest
 
+    def _match_reference(self):
+        """Move (or report) files of the folder whose content is already in a reference library."""
         msg = self.lang_manager.get('scan_start') if self.lang_manager else "🔍 Duplicate scan started..."
         self.log_signal.emit(msg)
+        if self.catalog is None:
+            cat_msg = self.lang_manager.get('catalog_unavailable') if self.lang_manager else "❌ File catalog is not available"
+            self.log_signal.emit(cat_msg)
+            self.finished_signal.emit()
+            return
+
+        files = list_files(self.folder, should_stop=self.isInterruptionRequested, on_error=self._on_scan_error, prune=load_rules(self.folder))
+        if self.isInterruptionRequested():
+            self._stop()
+            return
+        self.progress_signal.emit(10)
+
+        engine = HashEngine(workers=self.hash_workers, algorithm=self.hash_algorithm)
+        by_size = self.catalog.rows_by_size(self.reference_roots, {e.size for e in files})
+        matches, report = match_reference(
+            files,
+            by_size,
+            full_hash=lambda e: cached_hash(self.catalog, e, engine),
+            reference_hash=lambda row: self._reference_hash(row, engine.algorithm),
+            should_stop=self.isInterruptionRequested,
+            on_progress=lambda p: self.progress_signal.emit(10 + int(p * 65)),
+            engine=engine,
+        )
+        if self.isInterruptionRequested():
+            self._stop()
+            return
+
+        for row, entry in matches:
+            lib_msg = self.lang_manager.get('in_library').format(entry.name, row.path) if self.lang_manager else f"📚 Already in library: {entry.name} = {row.path}"
+            self.log_signal.emit(lib_msg)
+        sum_msg = self.lang_manager.get('reference_summary').format(report.files, report.size_candidates, report.duplicates) if self.lang_manager else f"📚 {report.files} files → {report.size_candidates} same size as library files → {report.duplicates} already in library"
+        self.log_signal.emit(sum_msg)
+
+        if self.report_path:
+            self._save_report(build_report(self.folder, [[row, entry] for row, entry in matches]))
+            self.progress_signal.emit(100)
+            self.finished_signal.emit()
+            return
+
+        duplicates = [(Path(row.path), Path(entry.path), entry.size) for row, entry in matches]
+        if self._resolve(duplicates, []):
+            return
+        self.progress_signal.emit(100)
+        self.finished_signal.emit()
+
+    def _resolve(self, duplicates, similar):
+        """Act on confirmed (keep, dup, size) tuples. Returns True if interrupted."""
+        if duplicates:
+            if self.action in ('hardlink', 'reflink'):
+                if self._link_duplicates(duplicates):
+                    return True
+            else:
+                if self._move_duplicates(duplicates + similar):
+                    return True
+                similar = []
+        # Near-duplicates differ byte-wise, so they are never linked, only moved.
+        return bool(similar) and self._move_duplicates(similar)
 
-        # Optimization: group by size first. Different sizes can't be duplicates.
-        size_map = {}
-        for i, f in enumerate(files):
+    def _save_report(self, report):
+        totals = report['totals']
+        mb = round(totals['wasted_bytes'] / (1024 * 1024), 1)
+        try:
+            save_report(report, self.report_path)
+            saved_msg = self.lang_manager.get('report_saved').format(totals['groups'], totals['duplicates'], mb, self.report_path) if self.lang_manager else f"📋 Report saved: {totals['groups']} groups, {totals['duplicates']} duplicates, {mb} MB reclaimable → {self.report_path}"
+            self.log_signal.emit(saved_msg)
+        except OSError as e:
+            err_msg = self.lang_manager.get('error_file').format(os.path.basename(str(self.report_path)), e) if self.lang_manager else f"❌ Error: {os.path.basename(str(self.report_path))} ({e})"
+            self.log_signal.emit(err_msg)
+
+    def _apply_report(self):
+        """Resolve the duplicates listed in a saved report, re-checking only those files."""
+        try:
+            report = load_report(self.apply_report)
+        except (OSError, ValueError) as e:
+            err_msg = self.lang_manager.get('dup_report_read_error').format(e) if self.lang_manager else f"❌ Report could not be read: {e}"
+            self.log_signal.emit(err_msg)
+            self.finished_signal.emit()
+            return
+        if report.get('root') and os.path.isdir(report['root']):
+            # Moves go to the duplicates folder of the scanned root, as in the original run.
+            self.folder = Path(report['root'])
+        totals = report['totals']
+        mb = round(totals['wasted_bytes'] / (1024 * 1024), 1)
+        load_msg = self.lang_manager.get('report_loaded').format(totals['groups'], totals['duplicates'], mb) if self.lang_manager else f"📂 Report loaded: {totals['groups']} groups, {totals['duplicates']} duplicates, {mb} MB"
+        self.log_signal.emit(load_msg)
+
+        pairs = list(report_pairs(report))
+        duplicates, similar = [], []
+        for i, (kind, keep, dup) in enumerate(pairs):
             if self.isInterruptionRequested():
-                msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
-                self.log_signal.emit(msg)
-                self.finished_signal.emit()
+                self._stop()
                 return
+            keep_path, dup_path = Path(keep['path']), Path(dup['path'])
+            if not (unchanged(keep) and unchanged(dup)):
+                changed_msg = self.lang_manager.get('report_changed').format(dup_path.name) if self.lang_manager else f"⚠️ Changed since the report, left alone: {dup_path.name}"
+                self.log_signal.emit(changed_msg)
+            elif kind == 'similar':
+                similar.append((keep_path, dup_path, dup['size']))
+            elif self.action in ('hardlink', 'reflink'):
+                # Linking compares the bytes itself right before replacing.
+                duplicates.append((keep_path, dup_path, dup['size']))
+            elif same_content(keep_path, dup_path):
+                duplicates.append((keep_path, dup_path, dup['size']))
+            else:
+                diff_msg = self.lang_manager.get('verify_failed').format(dup_path.name) if self.lang_manager else f"⚠️ Content differs, left alone: {dup_path.name}"
+                self.log_signal.emit(diff_msg)
+            self.progress_signal.emit(int((i + 1) / max(1, len(pairs)) * 75))
+
+        if self._resolve(duplicates, similar):
+            return
+        self.progress_signal.emit(100)
+        self.finished_signal.emit()
+
+    def _find_similar(self, files, engine, exact_dups):
+        """Groups of near-duplicate images and videos (keeper first), or None if interrupted."""
+        candidates = [e for e in files if id(e) not in exact_dups]
+        algorithm = perceptual_algorithm()
+        groups = find_similar_groups(
+            [e for e in candidates if e.ext in IMAGE_EXTS],
+            threshold=self.similar_threshold,
+            engine=engine,
+            cached=lambda e: known_hash(self.catalog, e, algorithm),
+            store=(lambda e, v: self.catalog.put_hash(e, v, algorithm)) if self.catalog is not None else None,
+            should_stop=self.isInterruptionRequested,
+            on_progress=lambda p: self.progress_signal.emit(50 + int(p * 15)),
+        )
+        if self.isInterruptionRequested():
+            return None
+
+        # Videos: sampled-frame signatures, only with OpenCV installed.
+        video_groups = find_similar_videos(
+            [e for e in candidates if e.ext in VIDEO_EXTS],
+            threshold=self.similar_threshold,
+            engine=engine,
+            cached=lambda e: known_hash(self.catalog, e, VIDEO_ALGORITHM),
+            store=(lambda e, v: self.catalog.put_hash(e, v, VIDEO_ALGORITHM)) if self.catalog is not None else None,
+            should_stop=self.isInterruptionRequested,
+            on_progress=lambda p: self.progress_signal.emit(65 + int(p * 10)),
+        )
+        if self.isInterruptionRequested():
+            return None
+
+        for grp in groups:
+            keep = Path(grp[0].path)
+            for entry in grp[1:]:
+                f = Path(entry.path)
+                sim_msg = self.lang_manager.get('similar_found').format(f.name, keep.name) if self.lang_manager else f"🖼️ Similar Image: {f.name} ≈ {keep.name}"
+                self.log_signal.emit(sim_msg)
+        for grp in video_groups:
+            keep = Path(grp[0].path)
+            for entry in grp[1:]:
+                f = Path(entry.path)
+                sim_msg = self.lang_manager.get('similar_video_found').format(f.name, keep.name) if self.lang_manager else f"🎞️ Similar Video: {f.name} ≈ {keep.name}"
+                self.log_signal.emit(sim_msg)
+        return groups + video_groups
+
+    def _stop(self):
+        msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
+        self.log_signal.emit(msg)
+        self.finished_signal.emit()
+
+    def _move_duplicates(self, duplicates):
+        """Move duplicates into a folder. Returns True if interrupted."""
+        dup_folder = self.lang_manager.get('duplicate_folder') if self.lang_manager else "Duplicate_Files"
+        target_dir = self.folder / dup_folder
+        target_dir.mkdir(exist_ok=True)
+        conflicts = ConflictIndex(self.conflict, self.lang_manager)
+
+        for i, (_keep, dup, _size) in enumerate(duplicates):
+            if self.isInterruptionRequested():
+                self._stop()
+                return True
 
             try:
-                sz = f.stat().st_size
+                final_path, skip = conflicts.resolve(target_dir / dup.name)
+                if not skip:
+                    move_file(dup, final_path)
+                    if self.catalog is not None:
+                        self.catalog.move(dup, final_path)
+                    dup_msg = self.lang_manager.get('moved_to_duplicates').format(dup.name) if self.lang_manager else f"🗑️ Moved: {dup.name}"
+                    self.log_signal.emit(dup_msg)
+                else:
+                    skip_msg = self.lang_manager.get('skipped').format(dup.name) if self.lang_manager else f"⏩ Skipped: {dup.name}"
+                    self.log_signal.emit(skip_msg)
+
             except PermissionError:
-                read_msg = self.lang_manager.get('read_error').format(f.name) if self.lang_manager else f"❌ Read Permission Denied: {f.name}"
-                self.log_signal.emit(read_msg)
-                continue
-            except Exception:
-                continue
+                deny_msg = self.lang_manager.get('access_denied').format(dup.name) if self.lang_manager else f"❌ Access Denied: {dup.name}"
+                self.log_signal.emit(deny_msg)
+            except OSError as e:
+                move_msg = self.lang_manager.get('move_error').format(dup.name, e) if self.lang_manager else f"❌ Move Error: {dup.name} ({e})"
+                self.log_signal.emit(move_msg)
+            except Exception as e:
+                err_msg = self.lang_manager.get('error_file').format(dup.name, e) if self.lang_manager else f"❌ Error: {dup.name} ({e})"
+                self.log_signal.emit(err_msg)
 
-            size_map.setdefault(sz, []).append(f)
-            # first half of progress bar = scanning sizes
-            self.progress_signal.emit(int((i + 1) / total * 50))
+            self.progress_signal.emit(75 + int((i + 1) / len(duplicates) * 25))
+        return False
 
-        hashes = {}
-        duplicates = []
+    def _link_duplicates(self, duplicates):
+        """Replace duplicates with hardlinks/reflinks to the kept file. Returns True if interrupted."""
+        replace = replace_with_reflink if self.action == 'reflink' else replace_with_hardlink
+        reclaimed = 0
 
-        # Second phase: hash only candidates with same size
-        candidates = [grp for grp in size_map.values() if len(grp) > 1]
-        cand_total = sum(len(g) for g in candidates) or 1
-        done = 0
+        for i, (keep, dup, size) in enumerate(duplicates):
+            if self.isInterruptionRequested():
+                self._stop()
+                return True
 
-        for grp in candidates:
-            for f in grp:
-                if self.isInterruptionRequested():
-                    msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
-                    self.log_signal.emit(msg)
-                    self.finished_signal.emit()
-                    return
+            try:
+                # Hashes can collide and files can change after the scan: verify the bytes first.
+                if not same_content(keep, dup):
+                    changed_msg = self.lang_manager.get('verify_failed').format(dup.name) if self.lang_manager else f"⚠️ Content differs, left alone: {dup.name}"
+                    self.log_signal.emit(changed_msg)
+                else:
+                    replace(str(keep), str(dup))
+                    reclaimed += size
+                    link_msg = self.lang_manager.get('linked').format(dup.name, keep.name) if self.lang_manager else f"🔗 Linked: {dup.name} → {keep.name}"
+                    self.log_signal.emit(link_msg)
 
-                try:
-                    f_hash = get_hash(f)
-                    if not f_hash:
-                        continue
-                    if f_hash in hashes:
-                        duplicates.append(f)
-                        dup_msg = self.lang_manager.get('duplicate_found').format(f.name) if self.lang_manager else f"⚠️ Duplicate Found: {f.name}"
-                        self.log_signal.emit(dup_msg)
-                    else:
-                        hashes[f_hash] = f
-                except PermissionError:
-                    read_msg = self.lang_manager.get('read_error').format(f.name) if self.lang_manager else f"❌ Read Permission Denied: {f.name}"
-                    self.log_signal.emit(read_msg)
-                except Exception:
-                    pass
+            except PermissionError:
+                deny_msg = self.lang_manager.get('access_denied').format(dup.name) if self.lang_manager else f"❌ Access Denied: {dup.name}"
+                self.log_signal.emit(deny_msg)
+            except OSError as e:
+                link_err = self.lang_manager.get('link_error').format(dup.name, e) if self.lang_manager else f"❌ Link Error: {dup.name} ({e})"
+                self.log_signal.emit(link_err)
+            except Exception as e:
+                err_msg = self.lang_manager.get('error_file').format(dup.name, e) if self.lang_manager else f"❌ Error: {dup.name} ({e})"
+                self.log_signal.emit(err_msg)
 
-                done += 1
-                self.progress_signal.emit(50 + int(done / cand_total * 25))
+            self.progress_signal.emit(75 + int((i + 1) / len(duplicates) * 25))
 
-        # Move duplicates into a folder
-        if duplicates:
-            dup_folder = self.lang_manager.get('duplicate_folder') if self.lang_manager else "Duplicate_Files"
-            target_dir = self.folder / dup_folder
-            target_dir.mkdir(exist_ok=True)
+        mb = round(reclaimed / (1024 * 1024), 1)
+        space_msg = self.lang_manager.get('space_reclaimed').format(mb) if self.lang_manager else f"💾 Reclaimed {mb} MB"
+        self.log_signal.emit(space_msg)
+        return False
 
-            for i, dup in enumerate(duplicates):
-                if self.isInterruptionRequested():
-                    msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
-                    self.log_signal.emit(msg)
-                    self.finished_signal.emit()
-                    return
 
-                try:
-                    final_path, skip = resolve_conflict(target_dir / dup.name, self.conflict, self.lang_manager)
-                    if not skip:
-                        shutil.move(str(dup), str(final_path))
-                        dup_msg = self.lang_manager.get('moved_to_duplicates').format(dup.name) if self.lang_manager else f"🗑️ Moved: {dup.name}"
-                        self.log_signal.emit(dup_msg)
-                    else:
-                        skip_msg = self.lang_manager.get('skipped').format(dup.name) if self.lang_manager else f"⏩ Skipped: {dup.name}"
-                        self.log_signal.emit(skip_msg)
+class ReferenceIndexWorker(QThread):
+    """Walks reference libraries into the catalog and hashes files not indexed yet.
 
-                except PermissionError:
-                    deny_msg = self.lang_manager.get('access_denied').format(dup.name) if self.lang_manager else f"❌ Access Denied: {dup.name}"
-                    self.log_signal.emit(deny_msg)
-                except OSError as e:
-                    move_msg = self.lang_manager.get('move_error').format(dup.name, e) if self.lang_manager else f"❌ Move Error: {dup.name} ({e})"
-                    self.log_signal.emit(move_msg)
-                except Exception as e:
-                    err_msg = self.lang_manager.get('error_file').format(dup.name, e) if self.lang_manager else f"❌ Error: {dup.name} ({e})"
-                    self.log_signal.emit(err_msg)
+    Only new or changed files are read; re-running it on an unchanged
+    library is a stat-only walk.
+    """
+    log_signal = Signal(str)
+    progress_signal = Signal(int)
+    finished_signal = Signal()
 
-                self.progress_signal.emit(75 + int((i + 1) / len(duplicates) * 25))
+    def __init__(self, roots, lang_manager=None, hash_workers=DEFAULT_HASH_WORKERS, hash_algorithm='md5'):
+        super().__init__()
+        self.roots = [Path(r) for r in roots]
+        self.lang_manager = lang_manager
+        self.hash_workers = hash_workers
+        self.hash_algorithm = hash_algorithm
 
-        self.progress_signal.emit(100)
+    def run(self):
+        catalog = open_catalog()
+        if catalog is None:
+            cat_msg = self.lang_manager.get('catalog_unavailable') if self.lang_manager else "❌ File catalog is not available"
+            self.log_signal.emit(cat_msg)
+            self.finished_signal.emit()
+            return
+        engine = HashEngine(workers=self.hash_workers, algorithm=self.hash_algorithm)
+        try:
+            for n, root in enumerate(self.roots):
+                entries = list_files(root, should_stop=self.isInterruptionRequested)
+                if self.isInterruptionRequested():
+                    break
+                catalog.sync(root, entries)
+                todo = [e for e in entries if not known_hash(catalog, e, engine.algorithm)]
+                idx_msg = self.lang_manager.get('reference_indexing').format(root, len(entries), len(todo)) if self.lang_manager else f"📚 Indexing {root}: {len(entries)} files, {len(todo)} to hash"
+                self.log_signal.emit(idx_msg)
+                for i, (entry, digest) in enumerate(engine.map(todo, should_stop=self.isInterruptionRequested)):
+                    if digest:
+                        catalog.put_hash(entry, digest, engine.algorithm)
+                    if i % 64 == 0:
+                        self.progress_signal.emit(int((n + (i + 1) / len(todo)) / len(self.roots) * 100))
+            if self.isInterruptionRequested():
+                msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
+                self.log_signal.emit(msg)
+            else:
+                done_msg = self.lang_manager.get('reference_indexed') if self.lang_manager else "✅ Reference library index is up to date"
+                self.log_signal.emit(done_msg)
+                self.progress_signal.emit(100)
+        finally:
+            catalog.close()
         self.finished_signal.emit()
 
 
@@ -251,63 +747,148 @@ class ConverterWorker(QThread):
     progress_signal = Signal(int)
     finished_signal = Signal()
     
-    def __init__(self, folder, target_format, conflict, lang_manager=None):
+    def __init__(self, folder, target_format, conflict, lang_manager=None, workers=DEFAULT_CONVERT_WORKERS, memory_budget=None, max_size=0, profile=DEFAULT_PROFILE):
         super().__init__()
         self.folder = Path(folder)
         self.target_format = target_format.lower()
         self.conflict = conflict
         self.lang_manager = lang_manager
+        # Longest side of the outputs in pixels; 0 keeps the original size
+        self.max_size = max_size
+        # Encoder settings, a key of converter.PROFILES
+        self.profile = profile
+        # Worker processes, and max bytes of decoded pixels in flight (None: a quarter of RAM)
+        self.workers = workers
+        self.memory_budget = memory_budget
 
     def run(self):
         valid_exts = IMAGE_EXTS  
-        files = [f for f in self.folder.rglob("*.*") if f.suffix.lower() in valid_exts]
-        total = len(files)
+        entries = list_files(self.folder, exts=valid_exts, should_stop=self.isInterruptionRequested, prune=load_rules(self.folder))
+        total = len(entries)
         
-        output_dir = self.folder / "Donusturulenler"
+        output_dir = self.folder / CONVERT_FOLDER
         output_dir.mkdir(exist_ok=True)
+        conflicts = ConflictIndex(self.conflict, self.lang_manager)
+        manifest = ConversionManifest.load(self.folder, output_dir)
         
         conv_msg = self.lang_manager.get('converting').format(self.target_format) if self.lang_manager else f"🔄 Converting -> {self.target_format}"
         self.log_signal.emit(conv_msg)
-        
-        for i, file in enumerate(files):
-            if self.isInterruptionRequested(): 
-                msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
-                self.log_signal.emit(msg)
-                self.finished_signal.emit()
-                return 
-            
-            if file.suffix.lower() == self.target_format: continue
-            
-            try:
-                img = Image.open(file)
-                if self.target_format in ['.jpg', '.jpeg'] and img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                target_file = output_dir / (file.stem + self.target_format)
-                final_path, skip = resolve_conflict(target_file, self.conflict, self.lang_manager)
-                
-                if not skip:
-                    img.save(final_path, quality=95)
-                    conv_done_msg = self.lang_manager.get('converted').format(file.name) if self.lang_manager else f"✅ Converted: {file.name}"
-                    self.log_signal.emit(conv_done_msg)
-                else:
-                    skip_msg = self.lang_manager.get('skipped').format(file.name) if self.lang_manager else f"⏩ Skipped: {file.name}"
+
+        # Outputs of deleted sources go first, so their names are free for this run.
+        orphans = [] if self.isInterruptionRequested() else manifest.remove_orphans()
+
+        # Output names are decided here (in order); only decode/encode runs in the pool.
+        tasks = []
+        by_src = {}
+        done = unchanged = 0
+        # Output path -> source that writes it. Overwrite mode hands the same name to
+        # every source with the same stem; parallel writes to it would race.
+        claimed = manifest.outputs()
+        for entry in entries:
+            if entry.ext == self.target_format and not self.max_size:
+                done += 1
+                continue
+            task = ConvertTask(entry.path, "", self.target_format, self.max_size, self.profile)
+            if manifest.up_to_date(entry, task):
+                done += 1
+                unchanged += 1
+                continue
+            # Changed source or settings: replace our previous output in this format instead of adding a copy.
+            final_path = manifest.output_of(entry.path, self.target_format)
+            if final_path is None:
+                manifest.forget(entry.path, self.target_format)
+                final_path, skip = conflicts.resolve(output_dir / (os.path.splitext(entry.name)[0] + self.target_format))
+                if skip:
+                    done += 1
+                    skip_msg = self.lang_manager.get('skipped').format(entry.name) if self.lang_manager else f"⏩ Skipped: {entry.name}"
                     self.log_signal.emit(skip_msg)
-            
-            except UnidentifiedImageError:
-                corrupt_msg = self.lang_manager.get('corrupt_image').format(file.name) if self.lang_manager else f"❌ Corrupt/Unknown Image: {file.name}"
-                self.log_signal.emit(corrupt_msg)
-            except PermissionError:
-                deny_msg = self.lang_manager.get('access_denied').format(file.name) if self.lang_manager else f"❌ Access Denied: {file.name}"
-                self.log_signal.emit(deny_msg)
+                    continue
+            rel = os.path.relpath(entry.path, self.folder).replace(os.sep, "/")
+            owner = claimed.setdefault(os.path.normcase(os.fspath(final_path)), rel)
+            if owner != rel:
+                done += 1
+                col_msg = self.lang_manager.get('convert_collision').format(entry.name, owner) if self.lang_manager else f"⚠️ Skipped {entry.name}: {owner} has the same output name"
+                self.log_signal.emit(col_msg)
+                continue
+            tasks.append(task._replace(dst=str(final_path)))
+            by_src[entry.path] = entry
+
+        inc_msg = self.lang_manager.get('convert_incremental').format(unchanged, len(tasks), len(orphans)) if self.lang_manager else f"♻️ {unchanged} up to date, {len(tasks)} to convert, {len(orphans)} stale outputs removed"
+        self.log_signal.emit(inc_msg)
+
+        pool = ConversionPool(self.workers, self.memory_budget)
+        try:
+            for result in pool.run(tasks, should_stop=self.isInterruptionRequested):
+                self._log_result(result)
+                if result.status == 'ok':
+                    manifest.record(by_src[result.task.src], result.task)
+                done += 1
+                self.progress_signal.emit(int(done / total * 100))
+        finally:
+            try:
+                manifest.save()
             except OSError as e:
-                save_msg = self.lang_manager.get('save_error').format(file.name, e) if self.lang_manager else f"❌ Save Error: {file.name} ({e})"
+                save_msg = self.lang_manager.get('save_error').format(MANIFEST_NAME, e) if self.lang_manager else f"❌ Save Error: {MANIFEST_NAME} ({e})"
                 self.log_signal.emit(save_msg)
-            except Exception as e: 
-                unk_msg = self.lang_manager.get('unknown_error').format(file.name, e) if self.lang_manager else f"❌ Unknown Error ({file.name}): {e}"
-                self.log_signal.emit(unk_msg)
-            
-            self.progress_signal.emit(int((i + 1) / total * 100))
+
+        if self.isInterruptionRequested():
+            msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
+            self.log_signal.emit(msg)
+        self.finished_signal.emit()
+
+    def _log_result(self, result):
+        name = os.path.basename(result.task.src)
+        if result.status == 'ok':
+            msg = self.lang_manager.get('converted').format(name) if self.lang_manager else f"✅ Converted: {name}"
+        elif result.status == 'corrupt':
+            msg = self.lang_manager.get('corrupt_image').format(name) if self.lang_manager else f"❌ Corrupt/Unknown Image: {name}"
+        elif result.status == 'denied':
+            msg = self.lang_manager.get('access_denied').format(name) if self.lang_manager else f"❌ Access Denied: {name}"
+        elif result.status == 'save_error':
+            msg = self.lang_manager.get('save_error').format(name, result.detail) if self.lang_manager else f"❌ Save Error: {name} ({result.detail})"
+        else:
+            msg = self.lang_manager.get('unknown_error').format(name, result.detail) if self.lang_manager else f"❌ Unknown Error ({name}): {result.detail}"
+        self.log_signal.emit(msg)
+
+class EncoderBenchmarkWorker(QThread):
+    """Runs every encoder profile on a sample of the folder's images and logs speed and size."""
+
+    log_signal = Signal(str)
+    progress_signal = Signal(int)
+    finished_signal = Signal()
+
+    def __init__(self, folder, target_format, lang_manager=None, max_size=0, sample=BENCHMARK_SAMPLE):
+        super().__init__()
+        self.folder = Path(folder)
+        self.target_format = target_format.lower()
+        self.lang_manager = lang_manager
+        self.max_size = max_size
+        self.sample = sample
+
+    def run(self):
+        entries = list_files(self.folder, exts=IMAGE_EXTS, should_stop=self.isInterruptionRequested, prune=load_rules(self.folder))
+        # Fixed seed: the same folder gives the same sample, so runs are comparable.
+        sample = random.Random(0).sample(entries, min(self.sample, len(entries)))
+        msg = self.lang_manager.get('benchmark_start').format(len(sample), self.target_format) if self.lang_manager else f"📊 Benchmarking encoder profiles on {len(sample)} images -> {self.target_format}"
+        self.log_signal.emit(msg)
+
+        scores = benchmark_profiles(
+            [e.path for e in sample], self.target_format, self.max_size,
+            should_stop=self.isInterruptionRequested,
+            on_progress=lambda p: self.progress_signal.emit(int(p * 100)),
+        )
+        if self.isInterruptionRequested():
+            msg = self.lang_manager.get('process_stopped') if self.lang_manager else "🛑 Process stopped by user."
+            self.log_signal.emit(msg)
+            self.finished_signal.emit()
+            return
+
+        for profile, score in scores.items():
+            name = self.lang_manager.get(f'profile_{profile}') if self.lang_manager else profile
+            mb = round(score.bytes / (1024 * 1024), 2)
+            avg_kb = round(score.bytes / score.images / 1024) if score.images else 0
+            msg = self.lang_manager.get('benchmark_result').format(name, round(score.images_per_second, 1), mb, avg_kb) if self.lang_manager else f"📊 {name}: {round(score.images_per_second, 1)} img/s, {mb} MB total, {avg_kb} KB/image"
+            self.log_signal.emit(msg)
         self.finished_signal.emit()
 
 class PrivacyWorker(QThread):
@@ -323,14 +904,15 @@ class PrivacyWorker(QThread):
 
     def run(self):
         valid_exts = ['.jpg', '.jpeg', '.png', '.webp', '.tiff']
-        files = [f for f in self.folder.rglob("*.*") if f.suffix.lower() in valid_exts]
+        files = [Path(e.path) for e in list_files(self.folder, exts=valid_exts, should_stop=self.isInterruptionRequested, prune=load_rules(self.folder))]
         total = len(files)
         
-        output_dir = self.folder / "Guvenli_Fotograflar"
+        output_dir = self.folder / PRIVACY_FOLDER
         overwrite_mode = "Üstüne Yaz" in self.conflict or "Overwrite" in self.conflict
         
         if not overwrite_mode:
             output_dir.mkdir(exist_ok=True)
+        conflicts = ConflictIndex(self.conflict, self.lang_manager)
         
         clean_msg = self.lang_manager.get('cleaning_metadata') if self.lang_manager else "🛡️ Cleaning metadata..."
         self.log_signal.emit(clean_msg)
@@ -356,7 +938,7 @@ class PrivacyWorker(QThread):
                 else:
                     target_path = output_dir / file.name
 
-                final_path, skip = resolve_conflict(target_path, self.conflict, self.lang_manager)
+                final_path, skip = conflicts.resolve(target_path)
                 
                 if not skip:
                     clean_img.save(final_path)
@@ -405,11 +987,12 @@ class InpaintWorker(QThread):
             return
 
         # Resimleri listele
-        images = glob.glob(os.path.join(self.in_folder, '*.*'))
+        images = [e.path for e in list_files(self.in_folder, recursive=False)]
         total = len(images)
         
         repair_msg = self.lang_manager.get('repair_start') if self.lang_manager else "🔧 Repair started (Telea Algorithm)..."
         self.log_signal.emit(repair_msg)
+        conflicts = ConflictIndex(self.conflict, self.lang_manager)
 
         if total == 0:
             self.finished_signal.emit()
@@ -445,7 +1028,7 @@ class InpaintWorker(QThread):
                 target_path = Path(output_path)
                 
                 # Çakışma kontrolü
-                final_path, skip = resolve_conflict(target_path, self.conflict, self.lang_manager)
+                final_path, skip = conflicts.resolve(target_path)
                 
                 if not skip:
                     # Klasör yoksa oluştur (Garanti olsun)